@@ -0,0 +1,117 @@
+"""Benchmark: canvas item count and redraw cost for a long annotation session.
+
+Replays a synthetic 45-minute lecture (strokes of mouse-motion density) onto
+a Tk canvas twice: once with the old renderer (a create_line plus a
+create_oval per point) and once with one polyline item per stroke extended
+via coords(). Reports item count, build time, find_all time, full redraw time
+and the cost of one scale_annotations-style pass over every item.
+
+Needs a display (run under Xvfb on headless machines).
+Usage: python benchmarks/bench_canvas_items.py [strokes] [points_per_stroke]
+"""
+import sys
+import os
+import math
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from tkinter import Tk, Canvas, TclError
+
+# Same limit as whiteboard.MAX_POLYLINE_POINTS (importing whiteboard needs fitz/pyaudio)
+MAX_POLYLINE_POINTS = 256
+
+WIDTH, HEIGHT = 1280, 720
+
+def make_strokes(count, points_per_stroke):
+    random.seed(7)
+    strokes = []
+    for _ in range(count):
+        x, y = random.uniform(100, WIDTH - 100), random.uniform(100, HEIGHT - 100)
+        heading = random.uniform(0, 2 * math.pi)
+        points = []
+        for _ in range(points_per_stroke):
+            heading += random.uniform(-0.3, 0.3)
+            x = min(WIDTH, max(0, x + 2 * math.cos(heading)))
+            y = min(HEIGHT, max(0, y + 2 * math.sin(heading)))
+            points.append((x, y))
+        strokes.append(points)
+    return strokes
+
+def draw_segments(canvas, strokes, width=3, color="blue"):
+    """Old renderer: a line plus an endpoint oval per point."""
+    for points in strokes:
+        prev = None
+        for x, y in points:
+            if prev is not None:
+                canvas.create_line(prev[0], prev[1], x, y, fill=color, width=width,
+                                   capstyle="round", joinstyle="round", tags="annotation")
+            canvas.create_oval(x - width / 2, y - width / 2, x + width / 2, y + width / 2,
+                               fill=color, outline=color, tags="annotation")
+            prev = (x, y)
+
+def draw_polylines(canvas, strokes, width=3, color="blue"):
+    """New renderer: one smoothed polyline per stroke, extended with coords()."""
+    for points in strokes:
+        x, y = points[0]
+        item = canvas.create_line(x, y, x, y, fill=color, width=width, capstyle="round",
+                                  joinstyle="round", smooth=True, tags="annotation")
+        coords = [x, y]
+        for x, y in points[1:]:
+            if len(coords) >= MAX_POLYLINE_POINTS * 2:
+                last_x, last_y = coords[-2], coords[-1]
+                item = canvas.create_line(last_x, last_y, last_x, last_y, fill=color, width=width,
+                                          capstyle="round", joinstyle="round", smooth=True,
+                                          tags="annotation")
+                coords = [last_x, last_y]
+            coords.extend((x, y))
+            canvas.coords(item, *coords)
+
+def rescale_items(canvas, factor):
+    """The per-item coords/itemcget walk scale_annotations performs."""
+    for item in canvas.find_all():
+        coords = canvas.coords(item)
+        canvas.coords(item, *[c * factor for c in coords])
+        if canvas.type(item) == "line":
+            canvas.itemconfig(item, width=float(canvas.itemcget(item, "width")) * factor)
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def run(root, name, draw, strokes):
+    canvas = Canvas(root, width=WIDTH, height=HEIGHT, bg="white")
+    canvas.pack()
+    root.update()
+
+    build = timed(lambda: (draw(canvas, strokes), canvas.update()))
+    items = len(canvas.find_all())
+    find_all = timed(canvas.find_all)
+    redraw = timed(lambda: (canvas.move("annotation", 1, 1), canvas.update()))
+    rescale = timed(lambda: (rescale_items(canvas, 0.9), canvas.update()))
+
+    print(f"{name:>10} {items:>9} {build:>9.2f}s {find_all * 1000:>10.1f}ms "
+          f"{redraw * 1000:>10.1f}ms {rescale * 1000:>11.1f}ms")
+    canvas.destroy()
+
+def main():
+    stroke_count = int(sys.argv[1]) if len(sys.argv) > 1 else 600  # ~13 strokes/minute for 45 minutes
+    points_per_stroke = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+
+    try:
+        root = Tk()
+    except TclError as e:
+        print(f"Tk display not available ({e}); run under Xvfb.")
+        sys.exit(1)
+
+    strokes = make_strokes(stroke_count, points_per_stroke)
+    print(f"{stroke_count} strokes x {points_per_stroke} points\n")
+    print(f"{'renderer':>10} {'items':>9} {'build':>10} {'find_all':>12} {'redraw':>12} {'rescale':>13}")
+    run(root, "segments", draw_segments, strokes)
+    run(root, "polyline", draw_polylines, strokes)
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: bytes per page flip and encode time, PNG vs. page_codec tiers.
+
+Renders a photo-heavy slide, a text slide and a flat diagram slide at the
+standard wire resolution and encodes each as lossless PNG (the previous
+format) and at every codec tier. The diagram is line art, which every tier
+sends as PNG. Bytes are the base64 payload a
+student receives.
+Usage: python benchmarks/bench_page_codec.py
+"""
+import sys
+import os
+import time
+import base64
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from page_render import render_wire_page
+from page_codec import CODEC_TIERS, LOSSY_FORMAT, encode_image, encode_wire_page
+
+REPEATS = 5
+
+def make_slides(tmp):
+    doc = fitz.open()
+    # Photo slide: a large smooth-gradient-plus-noise image
+    photo = Image.radial_gradient("L").resize((1200, 900)).convert("RGB")
+    photo = Image.blend(photo, Image.effect_noise((1200, 900), 40).convert("RGB"), 0.3)
+    photo_path = os.path.join(tmp, "photo.jpg")
+    photo.save(photo_path, quality=90)
+    page = doc.new_page(width=960, height=540)
+    page.insert_image(fitz.Rect(40, 40, 920, 500), filename=photo_path)
+    # Line-art slide: text and shapes on white
+    page = doc.new_page(width=960, height=540)
+    for i in range(12):
+        page.insert_text((60, 60 + i * 36), f"Bullet point {i + 1}: the quick brown fox jumps over", fontsize=22)
+    page.draw_rect(fitz.Rect(650, 100, 900, 300), color=(0, 0, 1), width=4)
+    # Diagram slide: flat filled shapes, no anti-aliased text
+    page = doc.new_page(width=960, height=540)
+    for i in range(6):
+        page.draw_rect(fitz.Rect(60 + i * 140, 120, 170 + i * 140, 420), color=(0, 0, 0),
+                       fill=(i / 6, 0.5, 1 - i / 6), width=0)
+    doc.save(os.path.join(tmp, "slides.pdf"))
+    return fitz.open(os.path.join(tmp, "slides.pdf"))
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return result, (time.perf_counter() - start) / REPEATS * 1000
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        doc = make_slides(tmp)
+        print(f"Lossy codec: {LOSSY_FORMAT}\n")
+        print(f"{'slide':>7} {'encoding':>14} {'format':>7} {'payload KB':>11} {'encode ms':>10}")
+        for name, page_num in (("photo", 0), ("text", 1), ("diagram", 2)):
+            img = render_wire_page(doc, page_num)
+            data, ms = timed(lambda: encode_image(img, "PNG"))
+            print(f"{name:>7} {'png (before)':>14} {'png':>7} {len(base64.b64encode(data)) / 1024:>11.1f} {ms:>10.1f}")
+            for tier in CODEC_TIERS:
+                wire_page, ms = timed(lambda: encode_wire_page(img, tier))
+                print(f"{name:>7} {tier:>14} {wire_page['image_format']:>7} "
+                      f"{len(base64.b64encode(wire_page['image_data'])) / 1024:>11.1f} {ms:>10.1f}")
+
+if __name__ == "__main__":
+    main()
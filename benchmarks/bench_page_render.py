@@ -0,0 +1,115 @@
+"""Benchmark: page-flip render time and peak RSS, 2x+LANCZOS vs. direct-to-target.
+
+Builds a synthetic deck (A4 slides plus large-format A0 posters with vector
+art and an embedded photo), then flips through it to a 1280x720 canvas.
+A flip produces both the canvas image and the raster sent to clients:
+
+  old  - one get_pixmap at a fixed 2x matrix, resized (LANCZOS) to fit the
+         canvas; the 2x raster itself went to clients
+  new  - get_pixmap with the matrix computed from canvas size and page rect,
+         plus a second get_pixmap at the standard wire tier (1600 px)
+
+Display and wire raster times are reported separately and summed into the
+flip time (encoding is the same in both modes and not included).
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+Usage: python benchmarks/bench_page_render.py [canvas_w canvas_h]
+"""
+import sys
+import os
+import time
+import json
+import random
+import resource
+import subprocess
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from page_render import render_page, render_page_to_box, render_wire_page
+
+FLIPS = 3  # passes over the deck
+
+def make_deck(path):
+    """A4 landscape slides mixed with A0 posters."""
+    random.seed(3)
+    doc = fitz.open()
+    photo = Image.effect_noise((800, 600), 64).convert("RGB")
+    photo_path = path + ".png"
+    photo.save(photo_path)
+    for i in range(12):
+        width, height = fitz.paper_size("a0") if i % 3 == 0 else fitz.paper_size("a4-l")
+        page = doc.new_page(width=width, height=height)
+        for _ in range(200):
+            x, y = random.uniform(0, width), random.uniform(0, height)
+            page.draw_circle((x, y), random.uniform(5, width / 20),
+                             color=(random.random(), random.random(), random.random()))
+        page.insert_image(fitz.Rect(width * 0.1, height * 0.5, width * 0.6, height * 0.9), filename=photo_path)
+        page.insert_text((width * 0.05, height * 0.1), f"Slide {i + 1}", fontsize=width / 20)
+    doc.save(path)
+    os.remove(photo_path)
+
+def fit_old(img, box_width, box_height):
+    """The previous render path: 2x raster, then LANCZOS to fit."""
+    aspect_ratio = img.width / img.height
+    if aspect_ratio > box_width / box_height:
+        size = (box_width, int(box_width / aspect_ratio))
+    else:
+        size = (int(box_height * aspect_ratio), box_height)
+    return img.resize(size, Image.LANCZOS)
+
+def run_mode(mode, path, box_width, box_height):
+    doc = fitz.open(path)
+    display_times, wire_times = [], []
+    for _ in range(FLIPS):
+        for page_num in range(len(doc)):
+            start = time.perf_counter()
+            if mode == "old":
+                wire = render_page(doc, page_num, 2)
+                img = fit_old(wire, box_width, box_height)
+            else:
+                img = render_page_to_box(doc, page_num, box_width, box_height)
+            img.tobytes()  # What ImageTk.PhotoImage would consume
+            display_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            if mode == "new":
+                wire = render_wire_page(doc, page_num)
+            wire.tobytes()  # What the wire encoder would consume
+            wire_times.append(time.perf_counter() - start)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024  # macOS reports bytes
+    print(json.dumps({"mode": mode, "display": display_times, "wire": wire_times, "peak_rss_mb": peak_kb / 1024}))
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] in ("old", "new"):
+        run_mode(sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    box_width = int(sys.argv[1]) if len(sys.argv) > 1 else 1280
+    box_height = int(sys.argv[2]) if len(sys.argv) > 2 else 720
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deck.pdf")
+        make_deck(path)
+        print(f"12-page deck (4 x A0, 8 x A4), {FLIPS} passes, canvas {box_width}x{box_height}\n")
+        print(f"{'mode':>5} {'display ms':>11} {'wire ms':>9} {'flip ms':>9} {'p95 ms':>9} {'max ms':>9} "
+              f"{'peak RSS MB':>12}")
+        for mode in ("old", "new"):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), mode, path,
+                                  str(box_width), str(box_height)],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            display, wire = result["display"], result["wire"]
+            times = sorted(d + w for d, w in zip(display, wire))
+            mean = sum(times) / len(times)
+            p95 = times[int(len(times) * 0.95) - 1]
+            print(f"{mode:>5} {sum(display) / len(display) * 1000:>11.1f} {sum(wire) / len(wire) * 1000:>9.1f} "
+                  f"{mean * 1000:>9.1f} {p95 * 1000:>9.1f} {times[-1] * 1000:>9.1f} "
+                  f"{result['peak_rss_mb']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark: peak server memory distributing a large PDF, one base64 blob vs. chunks.
+
+  blob    - read the whole file and base64-encode it (the old new_pdf path)
+  chunked - PdfDistributor: read and sent one acknowledged chunk at a time
+
+Each mode runs in its own subprocess; reported is the peak RSS growth over
+the interpreter baseline. Usage: python benchmarks/bench_pdf_distribution.py [size_mb]
+"""
+import sys
+import os
+import json
+import collections
+import base64
+import resource
+import subprocess
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from pdf_distribution import PdfDistributor
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class InlineBroadcaster:
+    """FIFO work queue standing in for the broadcast worker; acknowledges every chunk like a fast client."""
+
+    def __init__(self):
+        self.socketio = self
+        self.distributor = None
+        self.work = collections.deque()
+        self.sent = 0
+
+    def submit(self, fn, *args):
+        self.work.append((fn, args))
+
+    def run(self):
+        while self.work:
+            fn, args = self.work.popleft()
+            fn(*args)
+
+    def emit(self, event, data, room=None):
+        self.sent += len(data["data"])
+        self.submit(self.distributor.ack, room, data["pdf_hash"], data["seq"])
+
+def run_mode(mode, path):
+    baseline = peak_rss_mb()
+    if mode == "blob":
+        with open(path, "rb") as pdf_file:
+            sent = len(base64.b64encode(pdf_file.read()).decode('utf-8'))
+    else:
+        broadcaster = InlineBroadcaster()
+        distributor = broadcaster.distributor = PdfDistributor(broadcaster)
+        distributor.open(path, "bench")
+        distributor.send_from("client", "bench")
+        broadcaster.run()
+        sent = broadcaster.sent
+        distributor.close()
+    print(json.dumps({"sent_mb": sent / (1024 * 1024), "peak_growth_mb": peak_rss_mb() - baseline}))
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] in ("blob", "chunked"):
+        run_mode(sys.argv[1], sys.argv[2])
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deck.pdf")
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+        print(f"{size_mb} MB file\n")
+        print(f"{'mode':>8} {'sent MB':>9} {'peak RSS growth MB':>19}")
+        for mode in ("blob", "chunked"):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), mode, path],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:>8} {result['sent_mb']:>9.1f} {result['peak_growth_mb']:>19.1f}")
+
+if __name__ == "__main__":
+    main()
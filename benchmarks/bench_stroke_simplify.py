@@ -0,0 +1,109 @@
+"""Benchmark: points sent per stroke vs. visual error for the stroke simplifier.
+
+Synthetic strokes (lines, arcs, handwriting-like wiggles) are sampled at
+mouse-motion density and compared against the raw input after one of:
+
+  batched   - StrokeBatcher -> StrokeSimplifier, as the whiteboard (teacher) sends
+  per-point - one point per batch into a holding StrokeSimplifier, as the server
+              simplifies students on the per-point JSON protocol (the held point is
+              flushed at the end, as the idle flusher would)
+
+Usage: python benchmarks/bench_stroke_simplify.py
+"""
+import sys
+import os
+import math
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from stroke_batcher import StrokeBatcher
+from stroke_simplify import StrokeSimplifier, point_segment_distance
+
+PAGE_WIDTH_PX = 1920
+SAMPLE_STEP_PX = 1.5  # Average distance between Tk motion events
+TOLERANCES = [0, 0.0005, 0.001, 0.0015, 0.003, 0.006]
+
+def sample(path, length_px):
+    """Sample a parametric path (t in 0-1) at mouse-motion density, with jitter."""
+    count = max(2, int(length_px / SAMPLE_STEP_PX))
+    jitter = 0.4 / PAGE_WIDTH_PX
+    points = []
+    for i in range(count):
+        x, y = path(i / (count - 1))
+        points.append([x + random.uniform(-jitter, jitter), y + random.uniform(-jitter, jitter)])
+    return points
+
+def make_strokes():
+    random.seed(42)
+    strokes = []
+    for _ in range(20):
+        x0, y0 = random.random(), random.random()
+        x1, y1 = random.random(), random.random()
+        strokes.append(("line", sample(lambda t: (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t), 600)))
+    for _ in range(20):
+        cx, cy, r = random.uniform(0.2, 0.8), random.uniform(0.2, 0.8), random.uniform(0.02, 0.15)
+        strokes.append(("arc", sample(lambda t: (cx + r * math.cos(t * 5), cy + r * math.sin(t * 5)), 900)))
+    for _ in range(20):
+        x0, y0 = random.uniform(0.1, 0.6), random.uniform(0.1, 0.9)
+        strokes.append(("script", sample(
+            lambda t: (x0 + 0.3 * t, y0 + 0.01 * math.sin(t * 60) + 0.005 * math.cos(t * 23)), 1200)))
+    return strokes
+
+def run_pipeline(points, tolerance):
+    """Return the points that would be broadcast for one stroke."""
+    simplifier = StrokeSimplifier(tolerance)
+    sent = []
+    batcher = StrokeBatcher(lambda batch: sent.extend(
+        (simplifier.simplify("teacher", batch) or {"points": []})["points"]), max_points=16)
+    batcher.begin_stroke(points[0][0], points[0][1], 3, "blue")
+    for x, y in points[1:]:
+        batcher.add_point(x, y)
+    batcher.end_stroke()
+    return sent
+
+def run_per_point(points, tolerance):
+    """Return the points relayed for one stroke sent a point at a time."""
+    simplifier = StrokeSimplifier(tolerance, hold=True)
+    sent = []
+    for i, (x, y) in enumerate(points):
+        batch = simplifier.simplify("student", {"stroke_id": 1, "points": [[x, y]], "is_start": i == 0})
+        sent.extend((batch or {"points": []})["points"])
+    held = simplifier.flush("student")
+    sent.extend(held["points"] if held else [])
+    return sent
+
+def polyline_error(original, simplified):
+    """Max and mean distance from original points to the simplified polyline."""
+    if len(simplified) < 2:
+        simplified = simplified * 2
+    errors = []
+    for point in original:
+        errors.append(min(point_segment_distance(point, simplified[i], simplified[i + 1])
+                          for i in range(len(simplified) - 1)))
+    return max(errors), sum(errors) / len(errors)
+
+def main():
+    strokes = make_strokes()
+    print(f"{len(strokes)} strokes, {sum(len(p) for _, p in strokes)} raw points, page width {PAGE_WIDTH_PX}px\n")
+    print(f"{'pipeline':>9} {'tolerance':>10} {'kind':>7} {'raw/stroke':>11} {'sent/stroke':>12} "
+          f"{'reduction':>10} {'max err px':>11} {'mean err px':>12}")
+    for pipeline, run in (("batched", run_pipeline), ("per-point", run_per_point)):
+        for tolerance in TOLERANCES:
+            for kind in ("line", "arc", "script"):
+                raw = sent = 0
+                max_err = mean_err = 0.0
+                group = [p for k, p in strokes if k == kind]
+                for points in group:
+                    out = run(points, tolerance)
+                    raw += len(points)
+                    sent += len(out)
+                    worst, mean = polyline_error(points, out)
+                    max_err = max(max_err, worst)
+                    mean_err += mean / len(group)
+                print(f"{pipeline:>9} {tolerance:>10} {kind:>7} {raw / len(group):>11.1f} "
+                      f"{sent / len(group):>12.1f} {raw / max(sent, 1):>9.1f}x "
+                      f"{max_err * PAGE_WIDTH_PX:>11.2f} {mean_err * PAGE_WIDTH_PX:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: finding "the slide about X", linear text scan vs. the inverted index.
+
+Builds a synthetic deck and times, per query:
+
+  scan   - extract every page's text with fitz and look for the words (no index)
+  index  - TextIndex.search over an index built once when the deck is loaded
+
+Usage: python benchmarks/bench_text_search.py [pages]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+import fitz  # PyMuPDF
+
+from text_index import build_text_index, tokenize
+
+TOPICS = ["photosynthesis", "mitochondria", "osmosis", "enzyme", "chromosome", "ecosystem",
+          "respiration", "membrane", "nucleus", "protein", "diffusion", "genetics"]
+FILLER = ["the", "cell", "energy", "process", "example", "structure", "function", "system",
+          "level", "rate", "water", "light", "carbon", "oxygen", "growth", "model"]
+QUERIES = ["photosynthesis", "mitochondria enzyme", "osmo", "chromosome genetics"]
+
+def make_deck(path, pages):
+    random.seed(11)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=842, height=595)
+        words = [random.choice(FILLER) for _ in range(150)] + random.sample(TOPICS, 2)
+        random.shuffle(words)
+        page.insert_textbox(fitz.Rect(50, 50, 790, 560), f"Slide {i + 1}\n" + " ".join(words), fontsize=12)
+    doc.save(path)
+
+def scan(path, query):
+    words = tokenize(query)
+    with fitz.open(path) as document:
+        return [page.number for page in document if all(word in page.get_text().lower() for word in words)]
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deck.pdf")
+        make_deck(path, pages)
+
+        start = time.perf_counter()
+        index = build_text_index(path)
+        build_s = time.perf_counter() - start
+        print(f"{pages} pages, index built in {build_s:.2f} s ({len(index.vocabulary)} words)\n")
+        print(f"{'query':>22} {'hits':>5} {'scan ms':>9} {'index ms':>9}")
+        for query in QUERIES:
+            start = time.perf_counter()
+            scan(path, query)
+            scan_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            hits = index.search(query, limit=pages)
+            index_ms = (time.perf_counter() - start) * 1000
+            print(f"{query:>22} {len(hits):>5} {scan_ms:>9.1f} {index_ms:>9.2f}")
+
+if __name__ == "__main__":
+    main()
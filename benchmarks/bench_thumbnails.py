@@ -0,0 +1,68 @@
+"""Benchmark: cost of making a page reachable from the navigator, full render vs. thumbnail.
+
+Builds a synthetic slide deck, then times per page:
+
+  full        - render_page_to_box at a 1280x720 canvas (what a jump costs uncached)
+  thumb cold  - ThumbnailStore.thumbnail with an empty cache (render + save PNG)
+  thumb disk  - the same from a fresh store over the saved PNGs (a later session)
+
+Usage: python benchmarks/bench_thumbnails.py [pages]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+import fitz  # PyMuPDF
+
+from page_render import render_page_to_box
+from thumbnail_store import ThumbnailStore
+
+def make_deck(path, pages):
+    """Landscape slides with a title, body text and vector shapes."""
+    random.seed(5)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=842, height=595)
+        page.insert_text((60, 80), f"Lecture slide {i + 1}", fontsize=32)
+        for line in range(12):
+            page.insert_text((60, 140 + line * 28), " ".join(random.choice(("cell", "energy", "membrane",
+                             "protein", "light", "carbon")) for _ in range(9)), fontsize=16)
+        for _ in range(60):
+            x, y = random.uniform(450, 800), random.uniform(150, 560)
+            page.draw_circle((x, y), random.uniform(4, 30), color=(0, 0, 0),
+                             fill=(random.random(), random.random(), random.random()))
+    doc.save(path)
+
+def per_page_ms(fn, pages):
+    start = time.perf_counter()
+    for page_num in range(pages):
+        fn(page_num)
+    return (time.perf_counter() - start) * 1000 / pages
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deck.pdf")
+        make_deck(path, pages)
+        document = fitz.open(path)
+        cache_dir = os.path.join(tmp, "thumbnails")
+
+        full = per_page_ms(lambda n: render_page_to_box(document, n, 1280, 720), pages)
+        cold_store = ThumbnailStore(directory=cache_dir)
+        cold_store.open_document("deck")
+        cold = per_page_ms(lambda n: cold_store.thumbnail(document, "deck", n), pages)
+        disk_store = ThumbnailStore(directory=cache_dir)
+        disk = per_page_ms(lambda n: disk_store.thumbnail(document, "deck", n), pages)
+        document.close()
+
+    print(f"{pages} pages\n")
+    print(f"{'mode':>11} {'ms/page':>8} {'whole deck s':>13}")
+    for mode, ms in (("full", full), ("thumb cold", cold), ("thumb disk", disk)):
+        print(f"{mode:>11} {ms:>8.2f} {ms * pages / 1000:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+class AnnotationModel:
+    """Canvas annotations kept in normalized 0-1 page coordinates.
+
+    Every stroke item on the canvas has an entry holding its points and line
+    width relative to the page image, so the canvas can be re-projected exactly
+    after any resize without reading anything back from Tk.
+    """
+
+    def __init__(self):
+        self.strokes = {}  # {canvas item: {"points": [x0, y0, x1, y1, ...], "width": width / image_width}}
+
+    def add(self, item, x, y, line_width, image_width):
+        """Register a new stroke item starting at normalized (x, y)."""
+        self.strokes[item] = {
+            "points": [x, y],
+            "width": line_width / image_width if image_width > 0 else 0
+        }
+
+    def extend(self, item, x, y):
+        stroke = self.strokes.get(item)
+        if stroke is not None:
+            stroke["points"].extend((x, y))
+
+    def project(self, item, image_width, image_height, x_offset, y_offset):
+        """Canvas coordinates for a stroke (a single point is doubled so Tk accepts it)."""
+        points = self.strokes[item]["points"]
+        coords = []
+        for i in range(0, len(points), 2):
+            coords.append(points[i] * image_width + x_offset)
+            coords.append(points[i + 1] * image_height + y_offset)
+        if len(coords) == 2:
+            coords *= 2
+        return coords
+
+    def line_width(self, item, image_width):
+        return self.strokes[item]["width"] * image_width
+
+    def items(self):
+        return list(self.strokes)
+
+    def clear(self):
+        self.strokes.clear()
+
+    def __len__(self):
+        return len(self.strokes)
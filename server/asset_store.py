@@ -0,0 +1,153 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Memory budget for in-memory assets (page images); files are served from disk
+ASSET_STORE_BUDGET = 128 * 1024 * 1024  # bytes
+
+# Uploaded PDFs and images, stored once each as <sha256><ext>
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+FILE_EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/bmp": ".bmp",
+    "application/octet-stream": ".bin"
+}
+
+# Content-addressed assets never change, so clients may cache them forever
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+HASH_CHUNK = 1024 * 1024
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_hash(path):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class AssetStore:
+    """Thread-safe content-addressed store of the files served over HTTP.
+
+    In-memory assets (encoded page images) are kept in an LRU bounded by a
+    memory budget. File assets (uploaded PDFs and images) are copied once into
+    ``directory`` under their SHA-256; the in-memory index is rebuilt from
+    that directory on startup, so identical uploads are deduplicated across
+    restarts too.
+    """
+
+    def __init__(self, budget=ASSET_STORE_BUDGET, directory=ASSET_DIR):
+        self.budget = budget
+        self.directory = directory
+        self.blobs = OrderedDict()  # {hash: (mimetype, bytes)}
+        self.files = {}  # {hash: (mimetype, path)}
+        self.total_size = 0
+        self.lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.isdir(self.directory):
+            return
+        mimetypes = {ext: mimetype for mimetype, ext in FILE_EXTENSIONS.items()}
+        for name in os.listdir(self.directory):
+            digest, ext = os.path.splitext(name)
+            if len(digest) == 64 and ext in mimetypes:
+                self.files[digest] = (mimetypes[ext], os.path.join(self.directory, name))
+
+    def put(self, data, mimetype, digest=None):
+        """Store bytes and return their hash (storing the same content again is a no-op)."""
+        if digest is None:
+            digest = content_hash(data)
+        with self.lock:
+            if digest in self.blobs:
+                self.blobs.move_to_end(digest)
+                return digest
+            if len(data) > self.budget:
+                return digest
+            self.blobs[digest] = (mimetype, data)
+            self.total_size += len(data)
+            while self.total_size > self.budget:
+                _, (_, evicted) = self.blobs.popitem(last=False)
+                self.total_size -= len(evicted)
+        return digest
+
+    def _stored_path(self, digest, mimetype):
+        return os.path.join(self.directory, digest + FILE_EXTENSIONS.get(mimetype, ".bin"))
+
+    def _indexed(self, digest):
+        """(mimetype, path) of a stored file that still exists, else None."""
+        with self.lock:
+            entry = self.files.get(digest)
+        if entry is not None and os.path.exists(entry[1]):
+            return entry
+        return None
+
+    def add_file(self, path, mimetype):
+        """Import a file into the store; returns (hash, stored path). Known content is not copied again."""
+        digest = file_hash(path)
+        entry = self._indexed(digest)
+        if entry is not None:
+            return digest, entry[1]
+        with open(path, "rb") as source:
+            return self._write(source, mimetype, digest)
+
+    def add_stream(self, stream, mimetype, digest=None):
+        """Import a file-like object (e.g. an upload), hashing while it is written; returns (hash, stored path).
+
+        When the caller already knows the content's hash, known content is not written again.
+        """
+        if digest is not None:
+            entry = self._indexed(digest)
+            if entry is not None:
+                return digest, entry[1]
+        return self._write(stream, mimetype, digest)
+
+    def _write(self, source, mimetype, digest=None):
+        os.makedirs(self.directory, exist_ok=True)
+        hasher = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                for chunk in iter(lambda: source.read(HASH_CHUNK), b""):
+                    hasher.update(chunk)
+                    target.write(chunk)
+            if digest is None:
+                digest = hasher.hexdigest()
+                entry = self._indexed(digest)
+                if entry is not None:
+                    return digest, entry[1]
+            stored_path = self._stored_path(digest, mimetype)
+            os.replace(temp_path, stored_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        with self.lock:
+            self.files[digest] = (mimetype, stored_path)
+        return digest, stored_path
+
+    def get(self, digest):
+        """Return (mimetype, bytes) for a blob, or None."""
+        with self.lock:
+            entry = self.blobs.get(digest)
+            if entry is not None:
+                self.blobs.move_to_end(digest)
+            return entry
+
+    def get_file(self, digest):
+        """Return (mimetype, path) for a file asset, or None."""
+        with self.lock:
+            return self.files.get(digest)
+
+    def remove_file(self, digest):
+        with self.lock:
+            self.files.pop(digest, None)
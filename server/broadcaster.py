@@ -0,0 +1,97 @@
+import queue
+import threading
+
+# Socket.IO rooms: everyone watching, approved students, and one room per page
+VIEWERS_ROOM = "viewers"
+EDITORS_ROOM = "editors"
+NAMESPACE = "/"
+
+def page_room(page):
+    return f"page:{page}"
+
+def tier_room(tier):
+    """Viewers that receive page images at a given wire resolution tier."""
+    return f"tier:{tier}"
+
+class Broadcaster:
+    """Single fan-out worker that owns all outbound Socket.IO traffic.
+
+    Handlers (including the Tk thread) only enqueue work; serialization,
+    encoding and socket writes happen on the worker thread, in FIFO order.
+    """
+
+    def __init__(self, socketio, maxsize=10000):
+        self.socketio = socketio
+        self.outbound = queue.Queue(maxsize=maxsize)
+        self.current_page = 0
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the worker thread (idempotent)."""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name="broadcaster", daemon=True)
+            self.thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn on the worker thread."""
+        try:
+            self.outbound.put((fn, args, kwargs), block=False)
+        except queue.Full:
+            print(f"Warning: Broadcast queue full, dropping {getattr(fn, '__name__', fn)}")
+
+    def publish(self, event, data=None, room=None, skip_sid=None):
+        """Emit an event from the worker thread. room may be a sid or a room name."""
+        self.submit(self._emit, event, data, room, skip_sid)
+
+    def _emit(self, event, data, room, skip_sid):
+        args = () if data is None else (data,)
+        self.socketio.emit(event, *args, room=room, skip_sid=skip_sid)
+
+    def _run(self):
+        while True:
+            fn, args, kwargs = self.outbound.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"Error in broadcast worker: {e}")
+
+    # Room membership (in-memory bookkeeping, safe to call from any thread)
+
+    def enter_room(self, sid, room):
+        try:
+            self.socketio.server.enter_room(sid, room, namespace=NAMESPACE)
+        except Exception as e:
+            print(f"Error adding {sid} to room {room}: {e}")
+
+    def leave_room(self, sid, room):
+        try:
+            self.socketio.server.leave_room(sid, room, namespace=NAMESPACE)
+        except Exception as e:
+            print(f"Error removing {sid} from room {room}: {e}")
+
+    def room_members(self, room):
+        try:
+            return [sid for sid, _ in self.socketio.server.manager.get_participants(NAMESPACE, room)]
+        except KeyError:
+            return []
+
+    def add_viewer(self, sid):
+        """Register a newly connected client as a viewer of the current page."""
+        self.enter_room(sid, VIEWERS_ROOM)
+        self.enter_room(sid, page_room(self.current_page))
+
+    def set_page(self, page):
+        """Move every viewer into the room of the page now being shown."""
+        if page == self.current_page:
+            return
+        old_room, new_room = page_room(self.current_page), page_room(page)
+        self.current_page = page
+
+        def move_viewers():
+            for sid in self.room_members(VIEWERS_ROOM):
+                self.leave_room(sid, old_room)
+                self.enter_room(sid, new_room)
+        self.submit(move_viewers)
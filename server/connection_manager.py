@@ -1,7 +1,8 @@
 import time
 from tkinter import *
 from tkinter import ttk
-from server import connection_requests, connected_clients, connected_clients_lock, socketio
+from server import connection_requests, connected_clients, connected_clients_lock, socketio, broadcaster
+from broadcaster import EDITORS_ROOM
 
 class ConnectionRequestPanel:
     def __init__(self, parent):
@@ -75,11 +76,8 @@ class ConnectionRequestPanel:
             else:
                 # Disconnect stale
                 client_id = request_data["client_id"]
-                try:
-                    socketio.server.disconnect(client_id)
-                    print(f"Disconnected stale client request: {client_id}")
-                except Exception as e:
-                    print(f"Error disconnecting stale: {e}")
+                broadcaster.submit(socketio.server.disconnect, client_id)
+                print(f"Disconnecting stale client request: {client_id}")
         
         self.pending_requests = valid_requests
 
@@ -102,8 +100,9 @@ class ConnectionRequestPanel:
                     with connected_clients_lock:
                         connected_clients.add(client_id)
                     
-                    socketio.emit("allow_student", {"allowed_sid": client_id})
-                    socketio.emit("connection_approved", room=client_id)
+                    broadcaster.enter_room(client_id, EDITORS_ROOM)
+                    broadcaster.publish("allow_student", {"allowed_sid": client_id}, room=EDITORS_ROOM)
+                    broadcaster.publish("connection_approved", room=client_id)
                     print(f"Auto-approved connection from {client_ip} (ID: {client_id})")
                 else:
                     # Append to list - No overwriting!
@@ -164,8 +163,9 @@ class ConnectionRequestPanel:
             with connected_clients_lock:
                 connected_clients.add(client_id)
             
-            socketio.emit("allow_student", {"allowed_sid": client_id})
-            socketio.emit("connection_approved", room=client_id)
+            broadcaster.enter_room(client_id, EDITORS_ROOM)
+            broadcaster.publish("allow_student", {"allowed_sid": client_id}, room=EDITORS_ROOM)
+            broadcaster.publish("connection_approved", room=client_id)
             
             print(f"Approved connection from {client_ip} (ID: {client_id})")
             
@@ -189,11 +189,9 @@ class ConnectionRequestPanel:
             client_id = request_data["client_id"]
             client_ip = request_data["client_ip"]
             
-            socketio.emit("connection_rejected", room=client_id)
-            try:
-                socketio.server.disconnect(client_id)
-            except Exception as e:
-                print(f"Error disconnecting client {client_id}: {e}")
+            # Disconnect on the broadcast worker so the rejection is delivered first
+            broadcaster.publish("connection_rejected", room=client_id)
+            broadcaster.submit(socketio.server.disconnect, client_id)
             print(f"Rejected connection from {client_ip} (ID: {client_id})")
 
             # Remove from pending list
@@ -304,9 +302,10 @@ class ConnectedClientPanel:
                     with connected_clients_lock:
                         if sid in connected_clients:
                             connected_clients.remove(sid)
+                    broadcaster.leave_room(sid, EDITORS_ROOM)
                     
                     # Notify client their permission was revoked
-                    socketio.emit("force_disconnect", room=sid)
+                    broadcaster.publish("force_disconnect", room=sid)
                     
                     # Disconnect voice chat
                     print("Attempting to disconnect voice chat...")
@@ -0,0 +1,83 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+
+from page_cache import PageCache
+from page_codec import encode_wire_page, DEFAULT_CODEC_TIER
+from page_render import WIRE_TIERS
+
+# Uploads larger than this are rejected before they are decoded
+MAX_UPLOAD_BYTES = 32 * 1024 * 1024
+UPLOAD_READ_CHUNK = 256 * 1024
+
+# Transcoding is CPU-bound but Pillow releases the GIL, so a few threads run in parallel
+TRANSCODE_WORKERS = max(2, min(4, os.cpu_count() or 2))
+
+# Memory budget for transcoded renditions
+RENDITION_CACHE_BUDGET = 64 * 1024 * 1024  # bytes
+
+def read_upload(stream, limit=MAX_UPLOAD_BYTES):
+    """Read an upload stream into memory in chunks; raises ValueError past the size limit."""
+    buffer = io.BytesIO()
+    for chunk in iter(lambda: stream.read(UPLOAD_READ_CHUNK), b""):
+        if buffer.tell() + len(chunk) > limit:
+            raise ValueError(f"Upload exceeds {limit} bytes")
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+def image_header(data):
+    """Return (format, width, height) from an image's header, without decoding the pixels."""
+    with Image.open(io.BytesIO(data)) as img:
+        return img.format, img.width, img.height
+
+def transcode_image(data, max_edge, codec=DEFAULT_CODEC_TIER):
+    """Decode, orient, downscale and re-encode an uploaded image (change_page-style fields)."""
+    with Image.open(io.BytesIO(data)) as img:
+        # JPEG decoders can scale down while decoding, which is much cheaper for phone photos
+        img.draft("RGB", (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, "white")
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        return encode_wire_page(img, codec)
+
+class ImageUploads:
+    """Transcode uploaded images on a thread pool into cached, tier-sized renditions."""
+
+    def __init__(self, max_workers=TRANSCODE_WORKERS, budget=RENDITION_CACHE_BUDGET):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcode")
+        self.renditions = PageCache(budget)
+
+    def rendition(self, digest, data, tier, codec=DEFAULT_CODEC_TIER):
+        """Return the rendition of an image for a wire tier, transcoding it on a cache miss."""
+        key = (digest, 0, ("image", tier, codec))
+        wire_image = self.renditions.get(key)
+        if wire_image is None:
+            wire_image = transcode_image(data, WIRE_TIERS[tier], codec)
+            self.renditions.put(key, wire_image)
+        return wire_image
+
+    def publish(self, digest, data, tiers, on_ready):
+        """Produce a rendition per tier in parallel; on_ready(tier, rendition) runs on a pool thread."""
+        def work(tier):
+            try:
+                on_ready(tier, self.rendition(digest, data, tier))
+            except Exception as e:
+                print(f"Error transcoding uploaded image: {e}")
+        for tier in tiers:
+            self.executor.submit(work, tier)
+
+    def submit(self, fn, *args):
+        """Run other upload work (e.g. persisting the original) on the pool."""
+        def work():
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Error storing uploaded image: {e}")
+        self.executor.submit(work)
@@ -1,20 +1,22 @@
 #!/usr/bin/env python3
 import sys
-
-# Check Python version (3.11+ recommended, 3.9+ minimum)
-if sys.version_info < (3, 9):
-    print("Error: This application requires Python 3.9 or higher.")
-    print(f"You are using Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
-    sys.exit(1)
-elif sys.version_info < (3, 11):
-    print("WARNING: Python 3.11+ is recommended for optimal performance.")
-    print(f"You are using Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
-    print("The application will continue, but you may encounter compatibility issues.\n")
-
 import threading
 import socket
-from server import app, socketio
-from whiteboard import run_tkinter
+
+# Pre-render and text-index workers are spawned processes that re-import this
+# module as __mp_main__; everything heavy (Flask app, Tk, audio) stays under the
+# __main__ guard so they only load the modules they need.
+
+def check_python_version():
+    # Check Python version (3.11+ recommended, 3.9+ minimum)
+    if sys.version_info < (3, 9):
+        print("Error: This application requires Python 3.9 or higher.")
+        print(f"You are using Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
+        sys.exit(1)
+    elif sys.version_info < (3, 11):
+        print("WARNING: Python 3.11+ is recommended for optimal performance.")
+        print(f"You are using Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
+        print("The application will continue, but you may encounter compatibility issues.\n")
 
 def get_local_ip():
     """Get the local IP address of the machine."""
@@ -29,9 +31,19 @@ def get_local_ip():
         return "127.0.0.1"
 
 if __name__ == "__main__":
+    check_python_version()
+    
+    from server import app, socketio, broadcaster, start_held_point_flusher
+    from whiteboard import run_tkinter
+    
     host_ip = get_local_ip()
     print(f"Starting server on {host_ip}")
     
+    # Outbound Socket.IO fan-out worker
+    broadcaster.start()
+    # Releases stroke points the simplifier holds for senders that stopped drawing
+    start_held_point_flusher()
+    
     # Start Flask-SocketIO server in a separate thread
     flask_thread = threading.Thread(
         target=lambda: socketio.run(app, host="0.0.0.0", port=5000, allow_unsafe_werkzeug=True)
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+# Memory budget for cached page renders and encodes
+PAGE_CACHE_BUDGET = 256 * 1024 * 1024  # bytes
+
+def entry_size(value):
+    """Approximate memory held by a cache value (PIL images, bytes/str, or dicts/lists of those)."""
+    if isinstance(value, dict):
+        return sum(entry_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(entry_size(v) for v in value)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if hasattr(value, "size") and hasattr(value, "getbands"):
+        width, height = value.size
+        return width * height * len(value.getbands())
+    return 64
+
+def display_key(document_id, page_num, width, height):
+    """Cache key of a page image fitted to a width x height canvas."""
+    return (document_id, page_num, ("display", width, height))
+
+def wire_key(document_id, page_num, tier, codec):
+    """Cache key of a page's encoded change_page payload at a resolution tier and codec tier."""
+    return (document_id, page_num, ("wire", tier, codec))
+
+def tiles_key(document_id, page_num, tier, codec):
+    """Cache key of a page's encoded tiles at a resolution tier and codec tier."""
+    return (document_id, page_num, ("tiles", tier, codec))
+
+def preview_key(document_id, page_num):
+    """Cache key of a page's low-resolution preview."""
+    return (document_id, page_num, ("preview",))
+
+class PageCache:
+    """Thread-safe LRU cache of rendered pages, bounded by a memory budget.
+
+    Keys are ``(document_id, page_number, scale)``; values are display images
+    or encoded wire payloads.
+    """
+
+    def __init__(self, budget=PAGE_CACHE_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()  # {key: (value, size)}
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """Insert a value, evicting least recently used entries to stay within budget."""
+        if size is None:
+            size = entry_size(value)
+        if size > self.budget:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_size -= old[1]
+            self.entries[key] = (value, size)
+            self.total_size += size
+            while self.total_size > self.budget:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_size -= evicted_size
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def invalidate_document(self, document_id):
+        """Drop every entry belonging to a document."""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == document_id]:
+                self.total_size -= self.entries.pop(key)[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_size = 0
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.total_size,
+                    "hits": self.hits, "misses": self.misses}
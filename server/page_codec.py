@@ -0,0 +1,108 @@
+import io
+import hashlib
+from PIL import features
+
+# Quality tiers for page images sent to clients
+CODEC_TIERS = {
+    "low": 55,
+    "standard": 75,
+    "high": 90
+}
+DEFAULT_CODEC_TIER = "standard"
+
+# WebP when Pillow was built with it, JPEG otherwise
+LOSSY_FORMAT = "WEBP" if features.check("webp") else "JPEG"
+WEBP_METHOD = 0  # Encoder effort: fastest setting; output is within a few percent of method 1
+
+# Pages with at most this many distinct colours, most of them one background colour,
+# are treated as line art and sent as PNG
+LINE_ART_COLORS = 256
+LINE_ART_BACKGROUND = 0.5  # share of pixels in the most common colour
+
+def encode_image(img, image_format, quality=None):
+    buffer = io.BytesIO()
+    if image_format == "PNG":
+        img.save(buffer, format="PNG", optimize=False)
+    elif image_format == "WEBP":
+        img.save(buffer, format="WEBP", quality=quality, method=WEBP_METHOD)
+    else:
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+def is_line_art(img):
+    """True for flat-colour pages (diagrams, plain text) where PNG is about as small as a lossy codec.
+
+    A palette-sized photo (e.g. a greyscale picture) is not: PNG is several
+    times larger and slower to encode there.
+    """
+    colors = img.getcolors(LINE_ART_COLORS)
+    if colors is None:
+        return False
+    return max(colors)[0] >= LINE_ART_BACKGROUND * img.width * img.height
+
+def encode_page(img, tier=DEFAULT_CODEC_TIER):
+    """Encode a page image at a codec tier; returns (format name, bytes).
+
+    Photo-like pages use the lossy codec. Line art goes out as PNG, which keeps
+    it crisp at about the lossy size; each page is encoded only once.
+    """
+    if is_line_art(img):
+        return "png", encode_image(img, "PNG")
+    return LOSSY_FORMAT.lower(), encode_image(img, LOSSY_FORMAT, CODEC_TIERS[tier])
+
+IMAGE_MIMETYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg"
+}
+
+def encode_wire_page(img, tier=DEFAULT_CODEC_TIER):
+    """Encode a page image for delivery (raw bytes plus the change_page metadata)."""
+    image_format, data = encode_page(img, tier)
+    return {
+        "image_data": data,
+        "image_format": image_format,
+        "content_hash": hashlib.sha256(data).hexdigest(),
+        "canvas_width": img.width,
+        "canvas_height": img.height
+    }
+
+# Progressive delivery: a tiny preview first, then the full page as tiles
+PREVIEW_EDGE = 320  # longest edge in pixels
+PREVIEW_QUALITY = 40
+TILE_SIZE = 512
+
+def encode_preview(img):
+    """Encode a small, low-quality version of a page image to send ahead of the full page."""
+    preview = img.copy()
+    preview.thumbnail((PREVIEW_EDGE, PREVIEW_EDGE))
+    data = encode_image(preview, LOSSY_FORMAT, PREVIEW_QUALITY)
+    return {
+        "image_data": data,
+        "image_format": LOSSY_FORMAT.lower(),
+        "content_hash": hashlib.sha256(data).hexdigest(),
+        "canvas_width": preview.width,
+        "canvas_height": preview.height
+    }
+
+def encode_tiles(img, tier=DEFAULT_CODEC_TIER, tile_size=TILE_SIZE):
+    """Split a page image into tiles, each encoded (and content-addressed) on its own."""
+    tiles = []
+    for y in range(0, img.height, tile_size):
+        for x in range(0, img.width, tile_size):
+            tile = img.crop((x, y, min(x + tile_size, img.width), min(y + tile_size, img.height)))
+            image_format, data = encode_page(tile, tier)
+            tiles.append({
+                "x": x,
+                "y": y,
+                "width": tile.width,
+                "height": tile.height,
+                "image_data": data,
+                "image_format": image_format,
+                "content_hash": hashlib.sha256(data).hexdigest()
+            })
+    return {
+        "canvas_width": img.width,
+        "canvas_height": img.height,
+        "tiles": tiles
+    }
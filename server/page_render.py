@@ -0,0 +1,45 @@
+from PIL import Image
+import fitz  # PyMuPDF for PDF handling
+
+# Resolution tiers for page images sent to clients: longest edge in pixels
+WIRE_TIERS = {
+    "low": 960,
+    "standard": 1600,
+    "high": 2560
+}
+DEFAULT_WIRE_TIER = "standard"
+
+def render_page(document, page_num, zoom):
+    """Rasterize a PDF page to a PIL image."""
+    page = document[page_num]
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+def fit_zoom(page_rect, box_width, box_height):
+    """Zoom factor that makes a page fill a box while preserving aspect ratio."""
+    if page_rect.width <= 0 or page_rect.height <= 0:
+        return 1.0
+    return min(box_width / page_rect.width, box_height / page_rect.height)
+
+def render_page_to_box(document, page_num, box_width, box_height):
+    """Rasterize a page directly at the largest size that fits the box (no resampling)."""
+    zoom = fit_zoom(document[page_num].rect, box_width, box_height)
+    return render_page(document, page_num, zoom)
+
+def render_wire_page(document, page_num, tier=DEFAULT_WIRE_TIER):
+    """Rasterize a page at a wire resolution tier."""
+    edge = WIRE_TIERS[tier]
+    return render_page_to_box(document, page_num, edge, edge)
+
+def viewport_tier(width, height):
+    """Smallest wire tier that covers a client viewport (largest tier for bigger screens)."""
+    try:
+        longest = max(int(width), int(height))
+    except (TypeError, ValueError):
+        return DEFAULT_WIRE_TIER
+    if longest <= 0:
+        return DEFAULT_WIRE_TIER
+    for tier, edge in sorted(WIRE_TIERS.items(), key=lambda item: item[1]):
+        if edge >= longest:
+            return tier
+    return max(WIRE_TIERS, key=WIRE_TIERS.get)
@@ -0,0 +1,114 @@
+import threading
+
+# Chunked PDF transfer: chunk size and how many unacknowledged chunks a client may have
+PDF_CHUNK_SIZE = 256 * 1024  # bytes
+PDF_WINDOW = 4
+
+class PdfDistributor:
+    """Stream the current PDF to clients in sequenced, acknowledged chunks.
+
+    The file is read one chunk at a time, so server memory does not grow with
+    the deck. Each client has at most ``window`` chunks in flight; ``ack``
+    releases more. A client that reconnects resumes with
+    ``send_from(sid, digest, next_seq)``. Chunks are emitted on the broadcast
+    worker.
+    """
+
+    def __init__(self, broadcaster, chunk_size=PDF_CHUNK_SIZE, window=PDF_WINDOW):
+        self.broadcaster = broadcaster
+        self.chunk_size = chunk_size
+        self.window = window
+        self.digest = None
+        self.file = None
+        self.size = 0
+        self.total_chunks = 0
+        self.transfers = {}  # {sid: {"next": next seq to send, "acked": seqs acknowledged}}
+        self.lock = threading.Lock()
+
+    def open(self, path, digest):
+        """Make a file the deck being distributed (drops transfers of the previous one)."""
+        with self.lock:
+            if digest == self.digest:
+                return
+            self._close()
+            self.file = open(path, "rb")
+            self.size = self.file.seek(0, 2)
+            self.total_chunks = -(-self.size // self.chunk_size)
+            self.digest = digest
+
+    def transfer_info(self):
+        """Fields of the pdf_transfer announcement."""
+        with self.lock:
+            return {
+                "pdf_hash": self.digest,
+                "size": self.size,
+                "chunk_size": self.chunk_size,
+                "total_chunks": self.total_chunks
+            }
+
+    def send_from(self, sid, digest, seq=0):
+        """Start (or resume) sending a deck to a client at chunk seq. Returns False for a stale deck."""
+        with self.lock:
+            if digest != self.digest:
+                return False
+            seq = max(0, min(int(seq), self.total_chunks))
+            self.transfers[sid] = {"next": seq, "acked": seq}
+        self._pump(sid)
+        return True
+
+    def ack(self, sid, digest, seq):
+        """A client has received every chunk up to and including seq."""
+        with self.lock:
+            transfer = self.transfers.get(sid)
+            if transfer is None or digest != self.digest:
+                return
+            transfer["acked"] = max(transfer["acked"], min(int(seq) + 1, transfer["next"]))
+            if transfer["acked"] >= self.total_chunks:
+                del self.transfers[sid]
+                print(f"PDF transfer to {sid} complete ({self.total_chunks} chunks)")
+                return
+        self._pump(sid)
+
+    def _pump(self, sid):
+        """Queue chunks until the client's window is full."""
+        with self.lock:
+            transfer = self.transfers.get(sid)
+            if transfer is None:
+                return
+            digest, seqs = self.digest, []
+            while transfer["next"] < self.total_chunks and transfer["next"] - transfer["acked"] < self.window:
+                seqs.append(transfer["next"])
+                transfer["next"] += 1
+        for seq in seqs:
+            self.broadcaster.submit(self._send_chunk, sid, digest, seq)
+
+    def _send_chunk(self, sid, digest, seq):
+        with self.lock:
+            if digest != self.digest or sid not in self.transfers:
+                return
+            offset = seq * self.chunk_size
+            self.file.seek(offset)
+            data = self.file.read(self.chunk_size)
+        self.broadcaster.socketio.emit("pdf_chunk", {
+            "pdf_hash": digest,
+            "seq": seq,
+            "offset": offset,
+            "total_chunks": self.total_chunks,
+            "data": data
+        }, room=sid)
+
+    def forget(self, sid):
+        with self.lock:
+            self.transfers.pop(sid, None)
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        self.transfers.clear()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.digest = None
+        self.size = self.total_chunks = 0
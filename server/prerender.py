@@ -0,0 +1,123 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF for PDF handling
+
+from page_render import render_page_to_box, render_wire_page
+from page_codec import encode_wire_page
+
+# Leave a core for the Tk thread and the Socket.IO server
+PRERENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Share of the page cache one pre-render run may fill; the rest stays free for
+# on-demand renders, other wire tiers and tiles, so the run never evicts its own nearest pages
+PRERENDER_CACHE_SHARE = 0.5
+# Rough size of one encoded wire page, added to the display image when sizing the window
+WIRE_PAGE_ESTIMATE = 256 * 1024  # bytes
+
+# Documents opened inside each worker process ({path: fitz document})
+_worker_documents = {}
+
+def prerender_page(path, page_num, display_size, wire_tier, wire_codec):
+    """Render one page in a worker process: display image plus wire encode."""
+    document = _worker_documents.get(path)
+    if document is None:
+        # A new deck replaces whatever this worker had open
+        for old in _worker_documents.values():
+            old.close()
+        _worker_documents.clear()
+        document = _worker_documents[path] = fitz.open(path)
+
+    # Each output is rasterized at its own target resolution
+    display = render_page_to_box(document, page_num, *display_size) if display_size else None
+    wire_page = encode_wire_page(render_wire_page(document, page_num, wire_tier), wire_codec)
+    return page_num, display, wire_page
+
+def pages_by_distance(total_pages, current_page):
+    """Page numbers ordered by distance from the current page (next page before previous)."""
+    return sorted(range(total_pages), key=lambda p: (abs(p - current_page), p < current_page))
+
+def prerender_window(cache_budget, display_size):
+    """How many pages (display image plus wire encode) a run may pre-render within its cache share."""
+    width, height = display_size
+    page_bytes = width * height * 3 + WIRE_PAGE_ESTIMATE
+    return max(1, int(cache_budget * PRERENDER_CACHE_SHARE) // page_bytes)
+
+class PrerenderPipeline:
+    """Render a whole deck in the background on a process pool.
+
+    Results are handed to ``on_result(page_num, display_image, wire_page)`` from
+    a pool callback thread. Starting a new run or calling cancel() drops any
+    pending pages and ignores results still in flight.
+    """
+
+    def __init__(self, max_workers=PRERENDER_WORKERS):
+        self.max_workers = max_workers
+        self.executor = None
+        self.futures = []
+        self.generation = 0
+        self.done = 0
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def start(self, path, total_pages, current_page, display_size, wire_tier, wire_codec, on_result,
+              skip=None, max_pages=None):
+        """Queue the pages of a document nearest to current_page, nearest first.
+
+        max_pages limits the run to a window around current_page (see
+        prerender_window); skip(page_num) may return True for pages that are
+        already cached.
+        """
+        self.cancel()
+        if self.executor is None:
+            # spawn: never fork a process that is running Tk and server threads
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+
+        with self.lock:
+            generation = self.generation
+            window = pages_by_distance(total_pages, current_page)[:max_pages]
+            pages = [p for p in window if not (skip and skip(p))]
+            self.done = 0
+            self.total = len(pages)
+
+        for page_num in pages:
+            future = self.executor.submit(prerender_page, path, page_num, display_size, wire_tier, wire_codec)
+            future.add_done_callback(lambda f, g=generation: self._finished(f, g, on_result))
+            with self.lock:
+                self.futures.append(future)
+
+    def _finished(self, future, generation, on_result):
+        if future.cancelled():
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.done += 1
+        try:
+            page_num, display, wire_page = future.result()
+            on_result(page_num, display, wire_page)
+        except Exception as e:
+            print(f"Error pre-rendering page: {e}")
+
+    def cancel(self):
+        """Drop pending pages and ignore results from the current run."""
+        with self.lock:
+            self.generation += 1
+            futures, self.futures = self.futures, []
+            self.done = self.total = 0
+        for future in futures:
+            future.cancel()
+
+    def progress(self):
+        """Return (pages done, pages queued) for the current run."""
+        with self.lock:
+            return self.done, self.total
+
+    def shutdown(self):
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,118 @@
+import time
+import threading
+
+# Per-client stroke budget: sustained points/second and burst size
+STROKE_RATE = 240
+STROKE_BURST = 480
+# Most points one client may have waiting in coordinates_queue at once
+CLIENT_QUEUE_SHARE = 250
+
+class TokenBucket:
+    """Classic token bucket: refills at rate tokens/second up to capacity."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def take(self, count):
+        """Consume tokens; may go into debt so forced points are paid back later."""
+        self.tokens -= count
+
+def thin_points(points, keep, first=False):
+    """Keep `keep` points spread evenly along the list, always including both ends.
+
+    With room for a single point, that is the last one, or the first if
+    ``first`` (a stroke start must keep its real starting point).
+    """
+    if keep >= len(points):
+        return list(points)
+    if keep <= 1:
+        return [points[0]] if first else [points[-1]]
+    step = (len(points) - 1) / (keep - 1)
+    return [points[round(i * step)] for i in range(keep)]
+
+class StrokeAdmission:
+    """Decide how many of a client's stroke points enter the shared pipeline.
+
+    Every client has a token bucket and a cap on its share of coordinates_queue.
+    A client over budget has its batches thinned down to what it can afford; if
+    it cannot afford anything, its latest point is held back (coalescing any
+    earlier held point) and released with its next admitted batch. Stroke start
+    and end points are always admitted so stroke boundaries survive throttling.
+    The same admitted batches feed the local canvas and the broadcast.
+    """
+
+    def __init__(self, rate=STROKE_RATE, burst=STROKE_BURST, queue_share=CLIENT_QUEUE_SHARE):
+        self.rate = rate
+        self.burst = burst
+        self.queue_share = queue_share
+        self.buckets = {}  # {client_id: TokenBucket}
+        self.pending = {}  # {client_id: batch holding the latest coalesced point}
+        self.queued = {}   # {client_id: points waiting in coordinates_queue}
+        self.lock = threading.Lock()
+
+    def admit(self, client_id, batch):
+        """Return the list of batches (possibly empty) to publish for this packet."""
+        with self.lock:
+            bucket = self.buckets.get(client_id)
+            if bucket is None:
+                bucket = self.buckets[client_id] = TokenBucket(self.rate, self.burst)
+
+            admitted = []
+            held = self.pending.pop(client_id, None)
+            if held is not None:
+                if held["stroke_id"] == batch["stroke_id"] and not batch.get("is_start"):
+                    # Coalesced point continues this stroke: put it in front
+                    batch = dict(batch, points=held["points"] + batch["points"])
+                else:
+                    # Held point closes an earlier stroke: release it first
+                    admitted.append(held)
+                    bucket.take(len(held["points"]))
+
+            budget = min(bucket.refill(), self.queue_share - self.queued.get(client_id, 0))
+            points = batch["points"]
+            required = int(bool(batch.get("is_start"))) + int(bool(batch.get("is_end")))
+            required = min(required, len(points))
+
+            if len(points) <= budget:
+                keep = len(points)
+            elif budget >= 1 or required:
+                keep = max(int(budget), required, 1)
+            else:
+                # Out of budget mid-stroke: hold only the newest point
+                self.pending[client_id] = dict(batch, points=points[-1:], is_start=False)
+                return admitted
+
+            if keep < len(points):
+                starts_only = bool(batch.get("is_start")) and not batch.get("is_end")
+                batch = dict(batch, points=thin_points(points, keep, first=starts_only))
+            bucket.take(keep)
+            admitted.append(batch)
+            return admitted
+
+    def queued_points(self, client_id, count):
+        """Record points from client_id entering coordinates_queue."""
+        with self.lock:
+            self.queued[client_id] = self.queued.get(client_id, 0) + count
+
+    def consumed(self, client_id, count):
+        """Record points from client_id taken off coordinates_queue."""
+        with self.lock:
+            remaining = self.queued.get(client_id, 0) - count
+            if remaining > 0:
+                self.queued[client_id] = remaining
+            else:
+                self.queued.pop(client_id, None)
+
+    def forget(self, client_id):
+        with self.lock:
+            self.buckets.pop(client_id, None)
+            self.pending.pop(client_id, None)
@@ -0,0 +1,128 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+import fitz  # PyMuPDF for PDF handling
+
+class DocumentChanged(Exception):
+    """A render job was for a document other than the one now open."""
+
+class RenderService:
+    """Single worker thread that owns the open PDF and does all fitz/PIL work.
+
+    PyMuPDF is not thread-safe, so the document is only ever touched here.
+    ``request(slot, ...)`` is for the Tk thread: only the newest request per
+    slot is run, and its result is handed back through ``root.after``; a
+    result whose request was superseded (new page, new size, new document)
+    is dropped. ``call(...)`` is for other threads that can afford to block.
+    Jobs for a document that is no longer open raise ``DocumentChanged``
+    (see ``require``); ``request`` drops those quietly.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.jobs = queue.Queue()
+        self.document = None
+        self.path = None
+        self.document_id = None
+        self.latest = {}  # {slot: sequence number of the newest request}
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="render-service", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            job()
+
+    def _next(self, slot):
+        with self.lock:
+            self.sequence += 1
+            self.latest[slot] = self.sequence
+            return self.sequence
+
+    def _current(self, slot, sequence):
+        with self.lock:
+            return self.latest.get(slot) == sequence
+
+    def _deliver(self, slot, sequence, on_done, result):
+        """Hand a result to the Tk thread unless it has been superseded meanwhile."""
+        def finish():
+            if self._current(slot, sequence):
+                on_done(result)
+        try:
+            self.root.after(0, finish)
+        except RuntimeError:
+            print(f"Warning: Tk not reachable, dropping {slot} render result")
+
+    def request(self, slot, fn, *args, on_done=None):
+        """Run fn(document, *args) on the worker; newer requests on the same slot win."""
+        sequence = self._next(slot)
+
+        def job():
+            if not self._current(slot, sequence):
+                return  # Superseded before it started
+            try:
+                result = fn(self.document, *args)
+            except DocumentChanged:
+                return
+            except Exception as e:
+                print(f"Error in render service ({slot}): {e}")
+                return
+            if on_done is not None:
+                self._deliver(slot, sequence, on_done, result)
+        self.jobs.put(job)
+
+    def call(self, fn, *args):
+        """Run fn(document, *args) on the worker and wait for the result (not for the Tk thread)."""
+        if threading.current_thread() is self.thread:
+            return fn(self.document, *args)
+        future = Future()
+
+        def job():
+            try:
+                future.set_result(fn(self.document, *args))
+            except Exception as e:
+                future.set_exception(e)
+        self.jobs.put(job)
+        return future.result()
+
+    def load(self, path, document_id=None):
+        """Open a PDF in place of the current one and return its page count (render worker only)."""
+        self._close()
+        self.document = fitz.open(path)
+        self.path = path
+        self.document_id = document_id
+        return len(self.document)
+
+    def require(self, document_id):
+        """Raise DocumentChanged unless document_id is the open document (render worker only)."""
+        if self.document is None or document_id != self.document_id:
+            raise DocumentChanged(f"document {document_id} is not open")
+
+    def close_document(self):
+        """Drop pending results and close the open PDF."""
+        self.cancel()
+        self.jobs.put(self._close)
+
+    def _close(self):
+        if self.document is not None:
+            self.document.close()
+            self.document = None
+            self.path = None
+            self.document_id = None
+
+    def cancel(self, slot=None):
+        """Mark outstanding requests stale (on one slot, or all of them)."""
+        with self.lock:
+            if slot is None:
+                self.latest.clear()
+            else:
+                self.latest.pop(slot, None)
+
+    def shutdown(self):
+        self.close_document()
+        self.jobs.put(None)
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, send_file, abort
 from flask_socketio import SocketIO
 from PIL import Image
 import base64
@@ -6,6 +6,19 @@ import io
 import time
 import queue
 import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from stroke_codec import encode_stroke_batch, decode_stroke_batch, check_point, point_to_batch, batch_to_points, encode_snapshot, with_stroke_id
+from stroke_simplify import StrokeSimplifier
+from stroke_store import StrokeStore
+from rate_limit import StrokeAdmission
+from broadcaster import Broadcaster, VIEWERS_ROOM, EDITORS_ROOM, page_room, tier_room
+from page_render import viewport_tier, DEFAULT_WIRE_TIER
+from page_codec import IMAGE_MIMETYPES
+from asset_store import AssetStore, ASSET_CACHE_CONTROL, FILE_EXTENSIONS, content_hash
+from image_uploads import ImageUploads, read_upload, image_header
+from pdf_distribution import PdfDistributor
 
 # Flask App for Whiteboard
 app = Flask(__name__)
@@ -19,9 +32,33 @@ socketio = SocketIO(
     engineio_logger=False
 )
 
+# All outbound Socket.IO traffic goes through this worker (started by main.py)
+broadcaster = Broadcaster(socketio)
+
 # Queue for coordinates (bounded to prevent memory leak)
+# Items are (received_at, client_id, point); points carry their board stroke id
 coordinates_queue = queue.Queue(maxsize=1000)
 
+# Callback that wakes the coordinate consumer (registered by the whiteboard)
+coordinates_wakeup = None
+
+# Consumer-side metrics, updated by the whiteboard after each drain
+coordinate_metrics = {"queue_depth": 0, "lag_ms": 0.0, "max_lag_ms": 0.0, "processed": 0}
+coordinate_metrics_lock = threading.Lock()  # Thread-safe access
+
+def set_coordinates_wakeup(callback):
+    """Register the function called whenever new coordinates are queued."""
+    global coordinates_wakeup
+    coordinates_wakeup = callback
+
+def update_coordinate_metrics(lag_ms, processed):
+    """Record the result of one drain of coordinates_queue."""
+    with coordinate_metrics_lock:
+        coordinate_metrics["queue_depth"] = coordinates_queue.qsize()
+        coordinate_metrics["lag_ms"] = lag_ms
+        coordinate_metrics["max_lag_ms"] = max(coordinate_metrics["max_lag_ms"], lag_ms)
+        coordinate_metrics["processed"] += processed
+
 # Connection management
 connection_requests = queue.Queue()
 connected_clients = set()
@@ -31,30 +68,420 @@ connected_clients_lock = threading.Lock()  # Thread-safe access
 client_viewports = {}
 client_viewports_lock = threading.Lock()  # Thread-safe access
 
+# Page image resolution tier of each viewer, bucketed from its viewport ({client_id: tier})
+client_page_tiers = {}
+
+def set_page_tier(client_id, tier):
+    """Move a client into the room of its page image tier."""
+    with client_viewports_lock:
+        old_tier = client_page_tiers.get(client_id)
+        client_page_tiers[client_id] = tier
+    if old_tier == tier:
+        return
+    if old_tier is not None:
+        broadcaster.leave_room(client_id, tier_room(old_tier))
+    broadcaster.enter_room(client_id, tier_room(tier))
+
+def page_tier(client_id):
+    with client_viewports_lock:
+        return client_page_tiers.get(client_id, DEFAULT_WIRE_TIER)
+
+def page_tiers_in_use():
+    """Tiers that at least one connected viewer receives."""
+    with client_viewports_lock:
+        return set(client_page_tiers.values())
+
+# Negotiated stroke wire format per client ("json" unless the client opts in to "binary")
+WIRE_FORMATS = ("binary", "json")
+client_wire_formats = {}
+client_wire_formats_lock = threading.Lock()  # Thread-safe access
+
+# How each client receives page images and PDFs: "http" clients get a content-addressed
+# URL and fetch it themselves, "chunked" clients get page images inline and the PDF as
+# acknowledged pdf_chunk messages, "inline" clients get base64 payloads over the socket
+ASSET_DELIVERIES = ("http", "chunked", "inline")
+client_asset_deliveries = {}
+client_asset_deliveries_lock = threading.Lock()  # Thread-safe access
+
+# Clients that take pages progressively: page_preview first, then page_tiles/page_tile
+progressive_clients = set()
+
+# Asset hashes each client says it already holds ({client_id: set of hashes}); those
+# assets are announced without their bytes
+client_assets = {}
+MAX_CLIENT_ASSETS = 4096
+
+# Page images and PDFs served over HTTP, by SHA-256
+asset_store = AssetStore()
+
+# Streams the current PDF to "chunked" clients
+pdf_distributor = PdfDistributor(broadcaster)
+
+# Reads and base64-encodes whole PDFs for legacy clients, off the broadcast worker
+pdf_encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-encoder")
+
+# Transcodes uploaded images into per-tier renditions
+image_uploads = ImageUploads()
+
+# Current stroke of each sender ({client_id: (client stroke id, board stroke id)})
+client_stroke_ids = {}
+stroke_id_counter = itertools.count(1)
+
+def next_stroke_id():
+    """Allocate a board-wide unique stroke id."""
+    return next(stroke_id_counter)
+
+def assign_board_stroke_id(client_id, client_stroke_id, is_start):
+    """Map a sender's stroke onto a board-wide stroke id.
+
+    Legacy senders have no stroke id of their own (None), so only is_start
+    opens a new stroke for them.
+    """
+    current = client_stroke_ids.get(client_id)
+    if is_start or current is None or current[0] != client_stroke_id:
+        current = (client_stroke_id, next_stroke_id())
+        client_stroke_ids[client_id] = current
+    return current[1]
+
+# Point reduction applied to student strokes before they are queued and relayed
+stroke_simplifier = StrokeSimplifier(hold=True)
+
+# A point held back by the simplifier is sent anyway once its sender has been idle
+# this long (per-point JSON senders have no end-of-stroke marker)
+HELD_POINT_MAX_AGE = 0.12  # seconds
+held_point_flusher = None
+held_point_flusher_lock = threading.Lock()
+
+# Every stroke on the board (teacher and approved students), for late joiners
+stroke_store = StrokeStore()
+
+# Per-client token buckets and queue shares for incoming strokes
+stroke_admission = StrokeAdmission()
+
+def coordinates_consumed(client_id, count):
+    """Called by the coordinate consumer after taking a client's points off the queue."""
+    stroke_admission.consumed(client_id, count)
+
+def broadcast_stroke(batch, skip_sid=None, legacy_point=None, encoded=None):
+    """Send a stroke batch to the viewers of the current page (on the broadcast worker)."""
+    broadcaster.submit(deliver_stroke, batch, page_room(broadcaster.current_page),
+                       skip_sid, legacy_point, encoded)
+
+def deliver_stroke(batch, room, skip_sid=None, legacy_point=None, encoded=None):
+    """Emit a stroke batch to every client in its negotiated wire format.
+
+    JSON clients get ``stroke_batch`` (or the original ``coordinate_update`` point
+    when relaying a legacy sender); binary clients get ``stroke_binary``. Both
+    only go to the room's members, never back to the sender.
+    """
+    members = broadcaster.room_members(room)
+    recipients = [sid for sid in members if sid != skip_sid]
+    with client_wire_formats_lock:
+        binary = [sid for sid in recipients if client_wire_formats.get(sid) == "binary"]
+    json_sids = [sid for sid in recipients if sid not in binary]
+    
+    if legacy_point is not None:
+        emit_to("coordinate_update", legacy_point, room, members, json_sids)
+    else:
+        emit_to("stroke_batch", batch, room, members, json_sids)
+    
+    if binary:
+        if encoded is None:
+            encoded = encode_stroke_batch(batch)
+        emit_to("stroke_binary", encoded, room, members, binary)
+
+def send_stroke_snapshot(client_id, page=None):
+    """Send all strokes of a page to one client as a single message."""
+    if page is None:
+        page = stroke_store.current_page
+    broadcaster.submit(deliver_stroke_snapshot, client_id, page)
+
+def deliver_stroke_snapshot(client_id, page):
+    strokes = stroke_store.strokes(page)
+    
+    with client_wire_formats_lock:
+        wire_format = client_wire_formats.get(client_id, "json")
+    
+    if wire_format == "binary":
+        socketio.emit("stroke_snapshot_binary", encode_snapshot(page, strokes), room=client_id)
+    else:
+        socketio.emit("stroke_snapshot", {"page_number": page, "strokes": strokes}, room=client_id)
+    print(f"Sent {len(strokes)} strokes for page {page+1} to {client_id}")
+
+def page_url(digest):
+    return f"/assets/pages/{digest}"
+
+def pdf_url(digest):
+    return f"/assets/pdf/{digest}"
+
+def asset_recipients(room):
+    """Split a room's members by delivery, plus the progressive sids.
+    
+    "inline" covers every client that takes page images over the socket (including
+    "chunked" ones); "chunked" lists the clients that take the PDF in chunks.
+    """
+    members = broadcaster.room_members(room)
+    with client_asset_deliveries_lock:
+        http = [sid for sid in members if client_asset_deliveries.get(sid) == "http"]
+        chunked = [sid for sid in members if client_asset_deliveries.get(sid) == "chunked"]
+        progressive = [sid for sid in members if sid in progressive_clients]
+    inline = [sid for sid in members if sid not in http]
+    return members, {"http": http, "inline": inline, "chunked": chunked}, progressive
+
+def emit_to(event, data, room, members, recipients):
+    """Emit to the recipients among a room's members (the others are skipped)."""
+    if not recipients:
+        return
+    skip = [sid for sid in members if sid not in recipients]
+    socketio.emit(event, data, room=room, skip_sid=skip or None)
+
+def page_fields(page_num, wire_page):
+    return {
+        "page_number": page_num,
+        "content_hash": wire_page["content_hash"],
+        "image_format": wire_page["image_format"],
+        "canvas_width": wire_page["canvas_width"],
+        "canvas_height": wire_page["canvas_height"]
+    }
+
+def store_image(wire_page):
+    """Make an encoded image fetchable over HTTP; returns its hash."""
+    return asset_store.put(wire_page["image_data"], IMAGE_MIMETYPES[wire_page["image_format"]],
+                           wire_page["content_hash"])
+
+def asset_holders(sids, digest):
+    """The clients among sids that already hold an asset."""
+    with client_asset_deliveries_lock:
+        return [sid for sid in sids if digest in client_assets.get(sid, ())]
+
+def inline_image(wire_page):
+    return base64.b64encode(wire_page["image_data"]).decode('utf-8')
+
+def deliver_page(wire_page, page_num, room, tiles=None):
+    """Emit a page to a room (on the broadcast worker).
+    
+    Progressive clients get the page as tiles when ``tiles`` is given; everyone
+    else gets change_page, URL-only for HTTP clients and base64 for the rest.
+    """
+    members, by_delivery, progressive = asset_recipients(room)
+    if tiles is None:
+        progressive = []
+    
+    digest = store_image(wire_page)
+    fields = page_fields(page_num, wire_page)
+    inline = [sid for sid in by_delivery["inline"] if sid not in progressive]
+    http = [sid for sid in by_delivery["http"] if sid not in progressive]
+    holders = asset_holders(inline, digest)
+    inline = [sid for sid in inline if sid not in holders]
+    if holders:
+        emit_to("change_page", dict(fields, cached=True), room, members, holders)
+    if inline:
+        emit_to("change_page", dict(fields, page_image=inline_image(wire_page)), room, members, inline)
+    if http:
+        emit_to("change_page", dict(fields, page_url=page_url(digest)), room, members, http)
+    
+    if progressive:
+        deliver_tiles(tiles, page_num, wire_page["content_hash"], room, members, by_delivery, progressive)
+
+def deliver_tiles(tiles, page_num, content_hash, room, members, by_delivery, progressive):
+    """Send a tile manifest, then (to inline clients) each tile as its own message."""
+    manifest = {
+        "page_number": page_num,
+        "content_hash": content_hash,
+        "canvas_width": tiles["canvas_width"],
+        "canvas_height": tiles["canvas_height"],
+        "tiles": [{"x": t["x"], "y": t["y"], "width": t["width"], "height": t["height"],
+                   "tile_hash": t["content_hash"], "image_format": t["image_format"]}
+                  for t in tiles["tiles"]]
+    }
+    http = [sid for sid in by_delivery["http"] if sid in progressive]
+    inline = [sid for sid in by_delivery["inline"] if sid in progressive]
+    
+    if http:
+        # HTTP clients fetch tiles in parallel, straight from their cache on repeat visits
+        for tile in tiles["tiles"]:
+            store_image(tile)
+        with_urls = dict(manifest, tiles=[dict(entry, tile_url=page_url(entry["tile_hash"]))
+                                          for entry in manifest["tiles"]])
+        emit_to("page_tiles", with_urls, room, members, http)
+    
+    if inline:
+        emit_to("page_tiles", manifest, room, members, inline)
+        for entry, tile in zip(manifest["tiles"], tiles["tiles"]):
+            # Clients that already hold a tile composite it from their own cache
+            holders = asset_holders(inline, entry["tile_hash"])
+            emit_to("page_tile", dict(entry, page_number=page_num, content_hash=content_hash,
+                                      tile_image=inline_image(tile)), room, members,
+                    [sid for sid in inline if sid not in holders])
+
+def deliver_preview(preview, page_num, room=VIEWERS_ROOM):
+    """Send the low-resolution preview of a page to progressive clients (on the broadcast worker)."""
+    members, _, progressive = asset_recipients(room)
+    if not progressive:
+        return
+    fields = page_fields(page_num, preview)
+    emit_to("page_preview", dict(fields, page_image=inline_image(preview)), room, members, progressive)
+
+def deliver_pdf(digest, total_pages, current_page, room=VIEWERS_ROOM):
+    """Emit a stored PDF to a room: URL-only for HTTP clients, chunks or base64 for the rest (on the broadcast worker)."""
+    entry = asset_store.get_file(digest)
+    if entry is None:
+        print(f"Error: PDF {digest} is not in the asset store")
+        return
+    file_path = entry[1]
+    fields = {
+        "total_pages": total_pages,
+        "current_page": current_page,
+        "pdf_hash": digest
+    }
+    
+    members, by_delivery, _ = asset_recipients(room)
+    
+    # Clients that already hold this deck only need to be told which one it is
+    holders = asset_holders(by_delivery["inline"], digest)
+    emit_to("new_pdf", dict(fields, cached=True), room, members, holders)
+    by_delivery["inline"] = [sid for sid in by_delivery["inline"] if sid not in holders]
+    by_delivery["chunked"] = [sid for sid in by_delivery["chunked"] if sid not in holders]
+    
+    legacy = [sid for sid in by_delivery["inline"] if sid not in by_delivery["chunked"]]
+    if legacy:
+        # Older clients only understand the whole file in one message; encoding a big deck
+        # must not hold up the stroke traffic on this worker
+        pdf_encoder.submit(encode_legacy_pdf, file_path, fields, room, legacy)
+    emit_to("new_pdf", dict(fields, pdf_url=pdf_url(digest)), room, members, by_delivery["http"])
+    
+    if by_delivery["chunked"]:
+        pdf_distributor.open(file_path, digest)
+        emit_to("pdf_transfer", dict(fields, **pdf_distributor.transfer_info()), room, members,
+                by_delivery["chunked"])
+        for sid in by_delivery["chunked"]:
+            pdf_distributor.send_from(sid, digest)
+
+def encode_legacy_pdf(file_path, fields, room, legacy):
+    """Read and base64-encode a PDF, then queue its emit to legacy clients (runs on the PDF encoder)."""
+    try:
+        with open(file_path, "rb") as pdf_file:
+            pdf_base64 = base64.b64encode(pdf_file.read()).decode('utf-8')
+    except OSError as e:
+        print(f"Error reading PDF for legacy clients: {e}")
+        return
+    broadcaster.submit(emit_legacy_pdf, dict(fields, pdf_data=pdf_base64), room, legacy)
+
+def emit_legacy_pdf(data, room, legacy):
+    # Room membership may have changed while encoding, so who to skip is worked out now
+    emit_to("new_pdf", data, room, broadcaster.room_members(room), legacy)
+
+def is_progressive(client_id):
+    with client_asset_deliveries_lock:
+        return client_id in progressive_clients
+
+def progressive_tiers_in_use():
+    """Tiers that at least one progressive client receives."""
+    with client_viewports_lock:
+        tiers = dict(client_page_tiers)
+    with client_asset_deliveries_lock:
+        return {tier for sid, tier in tiers.items() if sid in progressive_clients}
+
+@app.route("/assets/pages/<digest>")
+def serve_page_image(digest):
+    """Serve an encoded page image by content hash (ETag, Range, immutable caching)."""
+    entry = asset_store.get(digest)
+    if entry is None:
+        abort(404)
+    mimetype, data = entry
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(digest)
+    response.headers["Cache-Control"] = ASSET_CACHE_CONTROL
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+def image_url(digest):
+    return f"/assets/images/{digest}"
+
+@app.route("/assets/pdf/<digest>")
+def serve_pdf(digest):
+    """Serve an uploaded PDF by content hash (ETag, Range, immutable caching)."""
+    return serve_file_asset(digest)
+
+@app.route("/assets/images/<digest>")
+def serve_uploaded_image(digest):
+    """Serve an uploaded image (transcoded rendition or original) by content hash."""
+    if asset_store.get(digest) is not None:
+        return serve_page_image(digest)
+    return serve_file_asset(digest)
+
+def serve_file_asset(digest):
+    entry = asset_store.get_file(digest)
+    if entry is None:
+        abort(404)
+    mimetype, path = entry
+    try:
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=digest)
+    except FileNotFoundError:
+        asset_store.remove_file(digest)
+        abort(404)
+    response.headers["Cache-Control"] = ASSET_CACHE_CONTROL
+    return response
+
 @app.route("/")
 def index():
     return "Server is running."
 
+@app.route("/metrics")
+def metrics():
+    """Report coordinate queue depth and processing lag."""
+    with coordinate_metrics_lock:
+        data = dict(coordinate_metrics)
+    data["queue_depth"] = coordinates_queue.qsize()
+    return jsonify(data)
+
 @app.route("/upload_image", methods=["POST"])
 def upload_image():
     """Handle image upload."""
     file = request.files.get("image")
-    if file:
-        file.save("uploaded_image.png")
-        # Convert to base64 and emit
-        with open("uploaded_image.png", "rb") as img_file:
-            img_bytes = img_file.read()
-            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-            # Get image dimensions
-            img = Image.open("uploaded_image.png")
-            width, height = img.size
-            socketio.emit("new_image", {
-                "image_data": img_base64,
-                "canvas_width": width,
-                "canvas_height": height
-            })
-        return jsonify({"message": "Image uploaded successfully"}), 200
-    return jsonify({"message": "No image uploaded"}), 400
+    if not file:
+        return jsonify({"message": "No image uploaded"}), 400
+    
+    # In memory, read in chunks; only the header is parsed on this thread
+    try:
+        data = read_upload(file.stream)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 413
+    try:
+        image_format, width, height = image_header(data)
+    except Exception:
+        return jsonify({"message": "Uploaded file is not an image"}), 400
+    digest = content_hash(data)
+    
+    # Each viewer tier gets a downscaled, transcoded rendition, cached by content hash
+    image_uploads.publish(digest, data, page_tiers_in_use() or {DEFAULT_WIRE_TIER},
+                          lambda tier, rendition: broadcaster.submit(deliver_image, rendition, digest, tier_room(tier)))
+    
+    # Keep the original in the content-addressed store (deduplicated), off the request thread
+    mimetype = Image.MIME.get(image_format, "application/octet-stream")
+    image_uploads.submit(asset_store.add_stream, io.BytesIO(data),
+                         mimetype if mimetype in FILE_EXTENSIONS else "application/octet-stream", digest)
+    
+    return jsonify({"message": "Image uploaded successfully", "image_hash": digest,
+                    "width": width, "height": height}), 200
+
+def deliver_image(rendition, source_hash, room=VIEWERS_ROOM):
+    """Emit new_image: URL-only for HTTP clients, base64 for the rest (on the broadcast worker)."""
+    digest = store_image(rendition)
+    fields = {
+        "image_hash": digest,
+        "source_hash": source_hash,
+        "image_format": rendition["image_format"],
+        "canvas_width": rendition["canvas_width"],
+        "canvas_height": rendition["canvas_height"]
+    }
+    
+    members, by_delivery, _ = asset_recipients(room)
+    holders = asset_holders(by_delivery["inline"], digest)
+    inline = [sid for sid in by_delivery["inline"] if sid not in holders]
+    emit_to("new_image", dict(fields, cached=True), room, members, holders)
+    emit_to("new_image", dict(fields, image_url=image_url(digest)), room, members, by_delivery["http"])
+    if inline:
+        emit_to("new_image", dict(fields, image_data=inline_image(rendition)), room, members, inline)
 
 @socketio.on("connect")
 def handle_connect():
@@ -63,6 +490,10 @@ def handle_connect():
     client_ip = request.remote_addr
     print(f"Connection request from {client_ip} (ID: {client_id})")
     
+    # Everyone watches; editing rights come later via the editors room
+    broadcaster.add_viewer(client_id)
+    set_page_tier(client_id, DEFAULT_WIRE_TIER)
+    
     # Auto-accept for view-only mode.
     # We do NOT add to connection_requests here.
     # Requests are only added when they ask for edit permission (Reason: User Requirement)
@@ -99,28 +530,192 @@ def handle_edit_permission(data):
     print(f"Request added to queue. New queue size: {connection_requests.qsize()}")
 @socketio.on("allow_student")
 def allowStudent(client_id):
-    socketio.emit("allow_student", {"allowed_sid": client_id})
+    broadcaster.publish("allow_student", {"allowed_sid": client_id}, room=EDITORS_ROOM)
+
+@socketio.on("negotiate_asset_delivery")
+def handle_asset_delivery_negotiation(data):
+    """Pick how a client receives page images and PDFs from the deliveries it supports."""
+    client_id = request.sid
+    supported = data.get("deliveries", []) if isinstance(data, dict) else []
+    chosen = next((delivery for delivery in ASSET_DELIVERIES if delivery in supported), "inline")
+    
+    progressive = bool(data.get("progressive")) if isinstance(data, dict) else False
+    
+    with client_asset_deliveries_lock:
+        client_asset_deliveries[client_id] = chosen
+        if progressive:
+            progressive_clients.add(client_id)
+        else:
+            progressive_clients.discard(client_id)
+    
+    broadcaster.publish("asset_delivery", {"delivery": chosen, "progressive": progressive}, room=client_id)
+    print(f"Client {client_id} negotiated {chosen} asset delivery")
+
+@socketio.on("have_assets")
+def handle_have_assets(data):
+    """A client lists asset hashes it already holds (e.g. from its cache after a reconnect)."""
+    client_id = request.sid
+    hashes = data.get("hashes", []) if isinstance(data, dict) else []
+    if not isinstance(hashes, list):
+        return
+    with client_asset_deliveries_lock:
+        held = client_assets.setdefault(client_id, set())
+        for digest in hashes[:MAX_CLIENT_ASSETS]:
+            if isinstance(digest, str) and len(held) < MAX_CLIENT_ASSETS:
+                held.add(digest)
+
+@socketio.on("pdf_chunk_ack")
+def handle_pdf_chunk_ack(data):
+    """A chunked client has received every PDF chunk up to data["seq"]."""
+    try:
+        pdf_distributor.ack(request.sid, data.get("pdf_hash"), int(data.get("seq", -1)))
+    except (AttributeError, TypeError, ValueError):
+        print(f"Ignoring malformed pdf_chunk_ack from {request.sid}")
+
+@socketio.on("resume_pdf")
+def handle_resume_pdf(data):
+    """Resume (or start) a chunked PDF transfer at data["next_seq"], e.g. after a reconnect."""
+    client_id = request.sid
+    try:
+        digest, next_seq = data.get("pdf_hash"), int(data.get("next_seq", 0))
+    except (AttributeError, TypeError, ValueError):
+        print(f"Ignoring malformed resume_pdf from {client_id}")
+        return
+    info = pdf_distributor.transfer_info()
+    # The announcement goes out before any chunk, as in deliver_pdf
+    if digest is not None and digest == info["pdf_hash"]:
+        broadcaster.publish("pdf_transfer", info, room=client_id)
+        if pdf_distributor.send_from(client_id, digest, next_seq):
+            print(f"Resuming PDF transfer to {client_id} at chunk {next_seq}")
+            return
+    # Not the deck being distributed (or it was replaced meanwhile)
+    broadcaster.publish("pdf_transfer_stale", {"pdf_hash": digest}, room=client_id)
+
+@socketio.on("negotiate_wire_format")
+def handle_wire_format_negotiation(data):
+    """Pick the stroke wire format for a client from the formats it supports."""
+    client_id = request.sid
+    supported = data.get("formats", []) if isinstance(data, dict) else []
+    chosen = next((fmt for fmt in WIRE_FORMATS if fmt in supported), "json")
+    
+    with client_wire_formats_lock:
+        client_wire_formats[client_id] = chosen
+    
+    broadcaster.publish("wire_format", {"format": chosen}, room=client_id)
+    print(f"Client {client_id} negotiated {chosen} stroke format")
 
 @socketio.on("send_coordinates")
 def handle_coordinates(data):
-    """Handle incoming coordinates from clients."""
+    """Handle incoming coordinates from clients (JSON point or binary batch)."""
     client_id = request.sid
     
     # Only process if client is approved (thread-safe check)
     with connected_clients_lock:
         is_approved = client_id in connected_clients
     
-    if is_approved:
+    if not is_approved:
+        print(f"Rejected coordinates from unapproved client {client_id}")
+        return
+    
+    if isinstance(data, (bytes, bytearray)):
         try:
-            coordinates_queue.put(data, block=False)
-        except queue.Full:
-            print(f"Warning: Coordinate queue full, dropping packet from {client_id}")
+            batch = decode_stroke_batch(data)
+        except ValueError as e:
+            print(f"Rejected malformed stroke payload from {client_id}: {e}")
             return
-        
-        # Broadcast to all other approved clients
-        socketio.emit("coordinate_update", data, skip_sid=request.sid)
+        stroke_id = assign_board_stroke_id(client_id, batch["stroke_id"], batch["is_start"])
+        batch["stroke_id"] = stroke_id
+        encoded, legacy_point = with_stroke_id(data, stroke_id), None
     else:
-        print(f"Rejected coordinates from unapproved client {client_id}")
+        try:
+            check_point(data)
+        except ValueError as e:
+            print(f"Rejected malformed stroke payload from {client_id}: {e}")
+            return
+        stroke_id = assign_board_stroke_id(client_id, None, data.get("is_start", False))
+        batch = point_to_batch(data, stroke_id)
+        encoded, legacy_point = None, dict(data, stroke_id=stroke_id)
+    
+    # A new stroke first releases the point still held from the previous one
+    if batch["is_start"]:
+        held = stroke_simplifier.flush(client_id)
+        if held is not None:
+            admit_client_batch(client_id, held)
+    
+    # Drop redundant points; re-encode only if the simplifier changed something
+    # (a per-point JSON sender may get back its previous, held point instead)
+    simplified = stroke_simplifier.simplify(client_id, batch)
+    if simplified is None:
+        return
+    if simplified["points"] != batch["points"]:
+        encoded, legacy_point = None, legacy_relay_point(client_id, simplified)
+    admit_client_batch(client_id, simplified, encoded, legacy_point)
+
+def legacy_relay_point(client_id, batch):
+    """coordinate_update form of a one-point batch from a per-point JSON sender (else None)."""
+    current = client_stroke_ids.get(client_id)
+    if current is None or current[0] is not None or len(batch["points"]) != 1:
+        return None
+    return batch_to_points(batch)[0]
+
+def admit_client_batch(client_id, batch, encoded=None, legacy_point=None):
+    """Rate-limit/coalesce a student batch, then publish exactly what was admitted."""
+    if legacy_point is None:
+        legacy_point = legacy_relay_point(client_id, batch)
+    for admitted in stroke_admission.admit(client_id, batch):
+        unchanged = admitted is batch
+        publish_client_batch(client_id, admitted,
+                             encoded=encoded if unchanged else None,
+                             legacy_point=legacy_point if unchanged else None)
+
+def flush_held_points():
+    """Send points the simplifier has held for senders gone idle (runs on its own thread)."""
+    while True:
+        time.sleep(HELD_POINT_MAX_AGE / 2)
+        for client_id, batch in stroke_simplifier.expired(HELD_POINT_MAX_AGE):
+            try:
+                admit_client_batch(client_id, batch)
+            except Exception as e:
+                print(f"Error flushing held stroke point from {client_id}: {e}")
+
+def start_held_point_flusher():
+    """Start the idle held-point flusher (idempotent)."""
+    global held_point_flusher
+    with held_point_flusher_lock:
+        if held_point_flusher is None:
+            held_point_flusher = threading.Thread(target=flush_held_points, name="held-point-flusher", daemon=True)
+            held_point_flusher.start()
+
+def publish_client_batch(client_id, batch, encoded=None, legacy_point=None):
+    """Queue a student batch for the local canvas, record it and relay it to other clients.
+
+    If coordinates_queue fills up part-way, only the points that were queued are
+    recorded and broadcast, so the teacher and student views stay identical.
+    """
+    points = batch_to_points(batch) if legacy_point is None else [legacy_point]
+    queued = 0
+    try:
+        received_at = time.monotonic()
+        for point in points:
+            coordinates_queue.put((received_at, client_id, point), block=False)
+            queued += 1
+    except queue.Full:
+        print(f"Warning: Coordinate queue full, dropped {len(points) - queued} point(s) from {client_id}")
+    finally:
+        stroke_admission.queued_points(client_id, queued)
+        if coordinates_wakeup is not None:
+            coordinates_wakeup()
+    
+    if queued == 0:
+        return
+    if queued < len(points):
+        batch = dict(batch, points=batch["points"][:queued], is_end=False)
+        encoded = None
+    
+    stroke_store.record(batch, client_id)
+    
+    # Broadcast to all other clients in their own wire format
+    broadcast_stroke(batch, skip_sid=client_id, legacy_point=legacy_point, encoded=encoded)
 
 @socketio.on("register_viewport")
 def handle_viewport_registration(data):
@@ -131,10 +726,13 @@ def handle_viewport_registration(data):
     with connected_clients_lock:
         is_approved = client_id in connected_clients
     
+    width = data.get("width", 0)
+    height = data.get("height", 0)
+    
+    # Every viewer gets page images sized for its screen
+    set_page_tier(client_id, viewport_tier(width, height))
+    
     if is_approved:
-        width = data.get("width", 0)
-        height = data.get("height", 0)
-        
         with client_viewports_lock:
             client_viewports[client_id] = {"width": width, "height": height}
 
@@ -149,12 +747,19 @@ def handle_client_disconnect():
         if client_id in connected_clients:
             connected_clients.remove(client_id)
             print(f"Removed {client_id} from connected_clients")
+    broadcaster.leave_room(client_id, EDITORS_ROOM)
     
     # Remove from viewports (thread-safe)
     with client_viewports_lock:
         if client_id in client_viewports:
             del client_viewports[client_id]
     
+    with client_wire_formats_lock:
+        client_wire_formats.pop(client_id, None)
+    client_stroke_ids.pop(client_id, None)
+    stroke_simplifier.forget(client_id)
+    stroke_admission.forget(client_id)
+    
     # Disconnect voice chat
     try:
         from whiteboard import whiteboard_instance
@@ -173,6 +778,18 @@ def handle_disconnect():
     with client_viewports_lock:
         if client_id in client_viewports:
             del client_viewports[client_id]
+        client_page_tiers.pop(client_id, None)
+    
+    with client_wire_formats_lock:
+        client_wire_formats.pop(client_id, None)
+    with client_asset_deliveries_lock:
+        client_asset_deliveries.pop(client_id, None)
+        progressive_clients.discard(client_id)
+        client_assets.pop(client_id, None)
+    pdf_distributor.forget(client_id)
+    client_stroke_ids.pop(client_id, None)
+    stroke_simplifier.forget(client_id)
+    stroke_admission.forget(client_id)
     
     # Remove from connected clients (thread-safe)
     with connected_clients_lock:
@@ -0,0 +1,29 @@
+import threading
+
+class SingleFlight:
+    """Coalesce concurrent work on the same key.
+
+    The first caller to ``join`` a key becomes the leader and does the work;
+    callers that join while it is in flight are only recorded. The leader then
+    calls ``finish`` to collect every waiter (itself included) and serve them
+    all with one result.
+    """
+
+    def __init__(self):
+        self.flights = {}  # {key: [waiters]}
+        self.lock = threading.Lock()
+
+    def join(self, key, waiter):
+        """Register a waiter; returns True if the caller should lead the flight."""
+        with self.lock:
+            waiters = self.flights.get(key)
+            if waiters is not None:
+                waiters.append(waiter)
+                return False
+            self.flights[key] = [waiter]
+            return True
+
+    def finish(self, key):
+        """End a flight and return all of its waiters."""
+        with self.lock:
+            return self.flights.pop(key, [])
@@ -0,0 +1,90 @@
+import time
+import threading
+
+# Batching limits (16-33 ms keeps strokes smooth at 30-60 fps on the client)
+BATCH_INTERVAL = 0.025  # seconds
+BATCH_MAX_POINTS = 32
+
+class StrokeBatcher:
+    """Collect stroke points and hand them out as time/count bounded batches.
+
+    Each batch is a dict shaped like the ``stroke_batch`` message:
+    ``{"stroke_id", "pen_color", "line_width", "points", "is_start", "is_end"}``
+    where ``points`` is a list of normalized ``[x, y]`` pairs.
+    """
+
+    def __init__(self, emit, interval=BATCH_INTERVAL, max_points=BATCH_MAX_POINTS, id_source=None):
+        self.emit = emit
+        self.id_source = id_source  # Optional callable returning the next stroke id
+        self.interval = interval
+        self.max_points = max_points
+        self.lock = threading.Lock()
+
+        self.next_stroke_id = 1
+        self.stroke = None  # Attributes of the stroke being drawn
+        self.points = []
+        self.batch_started = 0.0
+        self.start_pending = False
+
+    def begin_stroke(self, x, y, line_width, pen_color):
+        """Start a new stroke. Any unfinished stroke is closed first."""
+        if self.stroke is not None:
+            self.end_stroke()
+
+        with self.lock:
+            if self.id_source is not None:
+                stroke_id = self.id_source()
+            else:
+                stroke_id = self.next_stroke_id
+                self.next_stroke_id += 1
+            self.stroke = {
+                "stroke_id": stroke_id,
+                "pen_color": pen_color,
+                "line_width": line_width
+            }
+            self.points = [[x, y]]
+            self.batch_started = time.monotonic()
+            self.start_pending = True
+            return self.stroke["stroke_id"]
+
+    def add_point(self, x, y):
+        """Append a point to the current stroke, flushing if the batch is full."""
+        with self.lock:
+            if self.stroke is None:
+                return
+            if not self.points:
+                self.batch_started = time.monotonic()
+            self.points.append([x, y])
+            full = len(self.points) >= self.max_points
+        if full:
+            self.flush()
+
+    def flush_if_due(self):
+        """Flush the pending batch if it has been waiting longer than the interval."""
+        with self.lock:
+            due = bool(self.points) and time.monotonic() - self.batch_started >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self, is_end=False):
+        """Emit the pending points (if any) as one batch."""
+        with self.lock:
+            if self.stroke is None or (not self.points and not is_end):
+                return
+            batch = dict(self.stroke)
+            batch["points"] = self.points
+            batch["is_start"] = self.start_pending
+            batch["is_end"] = is_end
+            self.points = []
+            self.start_pending = False
+            if is_end:
+                self.stroke = None
+        self.emit(batch)
+
+    def end_stroke(self):
+        """Close the current stroke, sending whatever is left immediately."""
+        self.flush(is_end=True)
+
+    @property
+    def active(self):
+        return self.stroke is not None
@@ -0,0 +1,172 @@
+import math
+import struct
+import sys
+from array import array
+
+# Binary stroke wire format (little-endian):
+#   magic "S" | version | flags | line_width | stroke_id | color_len | color
+#   point_count | point_count * (x, y) as uint16 normalized to 0-65535
+WIRE_MAGIC = 0x53
+WIRE_VERSION = 1
+FLAG_START = 0x01
+FLAG_END = 0x02
+QUANT_SCALE = 65535
+
+HEADER = struct.Struct("<BBBBIB")
+COUNT = struct.Struct("<H")
+
+# Snapshot of a page's strokes: magic "P" | version | page | stroke_count,
+# then stroke_count * (uint32 length, encoded stroke batch)
+SNAPSHOT_MAGIC = 0x50
+SNAPSHOT_HEADER = struct.Struct("<BBII")
+RECORD_LENGTH = struct.Struct("<I")
+MAX_POINTS = 0xFFFF
+
+def quantize(value):
+    """Map a normalized 0-1 coordinate to uint16."""
+    if value <= 0:
+        return 0
+    if value >= 1:
+        return QUANT_SCALE
+    return int(value * QUANT_SCALE + 0.5)
+
+def encode_stroke_batch(batch):
+    """Pack a stroke batch dict into bytes."""
+    color = batch.get("pen_color", "black").encode("utf-8")[:255]
+    flags = (FLAG_START if batch.get("is_start") else 0) | (FLAG_END if batch.get("is_end") else 0)
+    line_width = max(0, min(255, int(batch.get("line_width", 1))))
+    points = batch.get("points", [])[:MAX_POINTS]
+
+    coords = array("H", [quantize(v) for point in points for v in point[:2]])
+    if sys.byteorder != "little":
+        coords.byteswap()
+
+    return b"".join((
+        HEADER.pack(WIRE_MAGIC, WIRE_VERSION, flags, line_width,
+                    batch.get("stroke_id", 0) & 0xFFFFFFFF, len(color)),
+        color,
+        COUNT.pack(len(points)),
+        coords.tobytes()
+    ))
+
+def decode_stroke_batch(payload):
+    """Unpack bytes produced by encode_stroke_batch. Raises ValueError if malformed."""
+    payload = bytes(payload)
+    if len(payload) < HEADER.size:
+        raise ValueError("stroke payload too short")
+
+    magic, version, flags, line_width, stroke_id, color_len = HEADER.unpack_from(payload, 0)
+    if magic != WIRE_MAGIC or version != WIRE_VERSION:
+        raise ValueError("unknown stroke payload format")
+
+    offset = HEADER.size
+    color = payload[offset:offset + color_len].decode("utf-8", errors="replace")
+    offset += color_len
+    if len(payload) < offset + COUNT.size:
+        raise ValueError("stroke payload truncated")
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    if len(payload) < offset + count * 4:
+        raise ValueError("stroke payload truncated")
+
+    coords = array("H")
+    coords.frombytes(payload[offset:offset + count * 4])
+    if sys.byteorder != "little":
+        coords.byteswap()
+
+    scale = 1.0 / QUANT_SCALE
+    points = [[coords[i] * scale, coords[i + 1] * scale] for i in range(0, len(coords), 2)]
+
+    return {
+        "stroke_id": stroke_id,
+        "pen_color": color,
+        "line_width": line_width,
+        "points": points,
+        "is_start": bool(flags & FLAG_START),
+        "is_end": bool(flags & FLAG_END)
+    }
+
+def with_stroke_id(payload, stroke_id):
+    """Return an encoded batch with its stroke id replaced, without re-encoding the points."""
+    payload = bytearray(payload)
+    struct.pack_into("<I", payload, 4, stroke_id & 0xFFFFFFFF)
+    return bytes(payload)
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def check_point(data):
+    """Validate a legacy single-point coordinate dict. Raises ValueError if malformed."""
+    if not isinstance(data, dict):
+        raise ValueError("coordinate payload is not an object")
+    if not (is_number(data.get("x")) and is_number(data.get("y"))):
+        raise ValueError("x and y must be finite numbers")
+    if "line_width" in data and not is_number(data["line_width"]):
+        raise ValueError("line_width must be a finite number")
+    if "pen_color" in data and not isinstance(data["pen_color"], str):
+        raise ValueError("pen_color must be a string")
+
+def point_to_batch(data, stroke_id):
+    """Wrap a legacy single-point coordinate dict as a one-point batch."""
+    return {
+        "stroke_id": stroke_id,
+        "pen_color": data.get("pen_color", "black"),
+        "line_width": data.get("line_width", 1),
+        "points": [[data["x"], data["y"]]],
+        "is_start": bool(data.get("is_start", False)),
+        "is_end": False
+    }
+
+def batch_to_points(batch):
+    """Expand a batch into single-point coordinate dicts tagged with the stroke id."""
+    points = []
+    last = len(batch["points"]) - 1
+    for i, (x, y) in enumerate(batch["points"]):
+        points.append({
+            "x": x,
+            "y": y,
+            "is_start": batch.get("is_start", False) and i == 0,
+            "is_end": batch.get("is_end", False) and i == last,
+            "line_width": batch.get("line_width", 1),
+            "pen_color": batch.get("pen_color", "black"),
+            "stroke_id": batch.get("stroke_id", 0)
+        })
+    return points
+
+def encode_snapshot(page, strokes):
+    """Pack complete strokes (batch dicts) for one page into a single payload.
+
+    Strokes longer than the per-batch point limit are split into continuation records.
+    """
+    records = []
+    for stroke in strokes:
+        points = stroke["points"]
+        for start in range(0, max(len(points), 1), MAX_POINTS):
+            chunk = dict(stroke)
+            chunk["points"] = points[start:start + MAX_POINTS]
+            chunk["is_start"] = start == 0
+            chunk["is_end"] = stroke.get("is_end", False) and start + MAX_POINTS >= len(points)
+            encoded = encode_stroke_batch(chunk)
+            records.append(RECORD_LENGTH.pack(len(encoded)))
+            records.append(encoded)
+
+    count = len(records) // 2
+    return SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, WIRE_VERSION, page, count) + b"".join(records)
+
+def decode_snapshot(payload):
+    """Unpack bytes produced by encode_snapshot into (page, [batch, ...])."""
+    payload = bytes(payload)
+    if len(payload) < SNAPSHOT_HEADER.size:
+        raise ValueError("snapshot payload too short")
+    magic, version, page, count = SNAPSHOT_HEADER.unpack_from(payload, 0)
+    if magic != SNAPSHOT_MAGIC or version != WIRE_VERSION:
+        raise ValueError("unknown snapshot format")
+
+    offset = SNAPSHOT_HEADER.size
+    batches = []
+    for _ in range(count):
+        (length,) = RECORD_LENGTH.unpack_from(payload, offset)
+        offset += RECORD_LENGTH.size
+        batches.append(decode_stroke_batch(payload[offset:offset + length]))
+        offset += length
+    return page, batches
@@ -0,0 +1,166 @@
+import time
+import threading
+
+# Default tolerance in normalized page units (~2 px on a 1280 px wide page)
+SIMPLIFY_TOLERANCE = 0.0015
+# Most points one held candidate may stand in for before it is sent anyway
+MAX_HELD_RUN = 64
+
+def point_segment_distance(point, start, end):
+    """Distance from point to the segment start-end."""
+    px, py = point
+    ax, ay = start
+    bx, by = end
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    cx, cy = ax + t * dx, ay + t * dy
+    return ((px - cx) ** 2 + (py - cy) ** 2) ** 0.5
+
+def simplify_points(points, tolerance=SIMPLIFY_TOLERANCE):
+    """Douglas-Peucker simplification. Always keeps the first and last point."""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            dist = point_segment_distance(points[i], points[first], points[last])
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [p for p, k in zip(points, keep) if k]
+
+def drop_close_points(points, anchor, tolerance=SIMPLIFY_TOLERANCE):
+    """Drop points closer than tolerance to the previously kept point."""
+    kept = []
+    last = anchor
+    for point in points:
+        if last is None or abs(point[0] - last[0]) > tolerance or abs(point[1] - last[1]) > tolerance:
+            kept.append(point)
+            last = point
+    return kept
+
+class StrokeSimplifier:
+    """Streaming point reduction for strokes that arrive in batches.
+
+    Each stroke key (a sender id) remembers the last point it sent so that
+    consecutive batches are simplified as one continuous polyline.
+
+    Senders using the per-point JSON protocol deliver one point per batch, which
+    gives Douglas-Peucker nothing to work on. With ``hold`` set, the newest point is held
+    back as a candidate: the next point replaces it as long as it (and every
+    point it replaced) stays within tolerance of the line from the last sent
+    point, so straight runs collapse to their ends. A candidate is sent once
+    the line bends, with the end of the stroke, or, as that protocol has no
+    end marker, through ``flush`` (next stroke start) and ``expired`` (sender
+    gone idle).
+    """
+
+    def __init__(self, tolerance=SIMPLIFY_TOLERANCE, hold=False):
+        self.tolerance = tolerance
+        self.hold = hold
+        self.last_sent = {}  # {key: last emitted point}
+        self.held = {}  # {key: (candidate point, points it replaced, its batch, time held)}
+        self.lock = threading.Lock()
+
+    def simplify(self, key, batch):
+        """Return a copy of batch with redundant points removed, or None if nothing is left to send."""
+        points = batch.get("points", [])
+        if self.tolerance <= 0 or (not points and not (batch.get("is_end") and key in self.held)):
+            return batch
+
+        with self.lock:
+            if batch.get("is_start"):
+                # Callers flush() a previous stroke's candidate first; anything left is stale
+                self.held.pop(key, None)
+            anchor = None if batch.get("is_start") else self.last_sent.get(key)
+
+            if self.hold and len(points) == 1 and anchor is not None and not batch.get("is_end"):
+                kept = self._stream_point(key, anchor, points[0], batch)
+                if not kept:
+                    return None
+                simplified = dict(batch)
+                simplified["points"] = kept
+                return simplified
+
+            held = self.held.pop(key, None)
+            if held is not None:
+                points = [held[0]] + points
+
+            kept = drop_close_points(points, anchor, self.tolerance)
+            if anchor is not None:
+                kept = simplify_points([anchor] + kept, self.tolerance)[1:]
+            else:
+                kept = simplify_points(kept, self.tolerance)
+
+            # Never lose the real end of a stroke
+            if batch.get("is_end") and (not kept or kept[-1] != points[-1]):
+                kept.append(points[-1])
+
+            if batch.get("is_end"):
+                self.last_sent.pop(key, None)
+            elif kept:
+                self.last_sent[key] = kept[-1]
+
+        if not kept and not batch.get("is_end"):
+            return None
+
+        simplified = dict(batch)
+        simplified["points"] = kept
+        return simplified
+
+    def _stream_point(self, key, anchor, point, batch):
+        """Hold a single point as the candidate; returns the points to send now (caller holds the lock)."""
+        held = self.held.get(key)
+        now = time.monotonic()
+        if held is None:
+            if drop_close_points([point], anchor, self.tolerance):
+                self.held[key] = (point, [], batch, now)
+            return []
+        candidate, replaced, _, _ = held
+        if not drop_close_points([point], candidate, self.tolerance):
+            return []
+        run = replaced + [candidate]
+        if len(run) < MAX_HELD_RUN and all(point_segment_distance(p, anchor, point) <= self.tolerance
+                                           for p in run):
+            # Still on one straight line from the anchor: the new point replaces the candidate
+            self.held[key] = (point, run, batch, now)
+            return []
+        # The line bends at the candidate: send it and hold the new point instead
+        self.last_sent[key] = candidate
+        self.held[key] = (point, [], batch, now)
+        return [candidate]
+
+    def _release(self, key):
+        """Pop a held candidate as a one-point batch to send (caller holds the lock)."""
+        candidate, _, batch, _ = self.held.pop(key)
+        self.last_sent[key] = candidate
+        return dict(batch, points=[candidate], is_start=False, is_end=False)
+
+    def flush(self, key):
+        """Return the held candidate of a sender as a batch to send, or None."""
+        with self.lock:
+            return self._release(key) if key in self.held else None
+
+    def expired(self, max_age):
+        """Return [(key, batch)] for candidates held longer than max_age seconds (idle senders)."""
+        cutoff = time.monotonic() - max_age
+        with self.lock:
+            return [(key, self._release(key)) for key in [k for k, held in self.held.items() if held[3] < cutoff]]
+
+    def forget(self, key):
+        """Drop any state held for a sender."""
+        with self.lock:
+            self.last_sent.pop(key, None)
+            self.held.pop(key, None)
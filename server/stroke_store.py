@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+
+class StrokeStore:
+    """In-memory record of every stroke on the board, indexed by page and stroke.
+
+    Strokes are keyed by ``(owner, stroke_id)`` where owner is ``"teacher"`` or a
+    client sid, so ids from different senders never collide.
+    """
+
+    def __init__(self):
+        self.pages = {}  # {page: OrderedDict{(owner, stroke_id): stroke}}
+        self.current_page = 0
+        self.lock = threading.Lock()
+
+    def record(self, batch, owner, page=None):
+        """Append a stroke batch to its stroke, creating the stroke on its first batch."""
+        if page is None:
+            page = self.current_page
+        key = (owner, batch["stroke_id"])
+
+        with self.lock:
+            strokes = self.pages.setdefault(page, OrderedDict())
+            stroke = strokes.get(key)
+            if stroke is None or batch.get("is_start"):
+                stroke = {
+                    "stroke_id": batch["stroke_id"],
+                    "pen_color": batch.get("pen_color", "black"),
+                    "line_width": batch.get("line_width", 1),
+                    "points": [],
+                    "is_end": False
+                }
+                strokes.pop(key, None)
+                strokes[key] = stroke
+            stroke["points"].extend(batch.get("points", []))
+            if batch.get("is_end"):
+                stroke["is_end"] = True
+
+    def strokes(self, page=None):
+        """Return copies of the strokes on a page in drawing order."""
+        if page is None:
+            page = self.current_page
+        with self.lock:
+            strokes = self.pages.get(page, {})
+            return [dict(stroke, points=list(stroke["points"])) for stroke in strokes.values()]
+
+    def stroke_count(self, page=None):
+        with self.lock:
+            return len(self.pages.get(self.current_page if page is None else page, {}))
+
+    def clear_page(self, page):
+        with self.lock:
+            self.pages.pop(page, None)
+
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
@@ -0,0 +1,146 @@
+import re
+import threading
+import multiprocessing
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF for PDF handling
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# The last word of a query also matches longer words once it has this many characters
+MIN_PREFIX_LENGTH = 2
+MAX_SEARCH_RESULTS = 50
+SNIPPET_CHARS = 60
+
+# Indexes of recently opened decks kept in memory, so reopening one needs no rebuild
+INDEX_CACHE_DECKS = 4
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+class TextIndex:
+    """Inverted index of a deck's text: word -> {page: occurrences}.
+
+    Every word of a query must appear on a page; the last word may be a prefix
+    (search-as-you-type). Pages are ranked by total occurrences.
+    """
+
+    def __init__(self, page_texts):
+        self.page_texts = page_texts
+        self.postings = {}  # {word: {page: count}}
+        for page_num, text in enumerate(page_texts):
+            for word in tokenize(text):
+                pages = self.postings.setdefault(word, {})
+                pages[page_num] = pages.get(page_num, 0) + 1
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.page_texts)
+
+    def _pages(self, word, prefix):
+        """{page: count} for a word, or for every indexed word it is a prefix of."""
+        if not prefix or len(word) < MIN_PREFIX_LENGTH:
+            return self.postings.get(word, {})
+        matches = {}
+        i = bisect_left(self.vocabulary, word)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(word):
+            for page_num, count in self.postings[self.vocabulary[i]].items():
+                matches[page_num] = matches.get(page_num, 0) + count
+            i += 1
+        return matches
+
+    def search(self, query, limit=MAX_SEARCH_RESULTS):
+        """Return [(page, snippet)] of the pages containing every word of the query, best first."""
+        words = tokenize(query)
+        if not words:
+            return []
+        postings = [self._pages(word, i == len(words) - 1) for i, word in enumerate(words)]
+        postings.sort(key=len)
+        scores = dict(postings[0])
+        for pages in postings[1:]:
+            scores = {page_num: score + pages[page_num] for page_num, score in scores.items() if page_num in pages}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda page_num: (-scores[page_num], page_num))[:limit]
+        return [(page_num, self.snippet(page_num, words)) for page_num in ranked]
+
+    def snippet(self, page_num, words):
+        """A short single-line excerpt of a page around the first query word found on it."""
+        text = self.page_texts[page_num]
+        lowered = text.lower()
+        positions = [pos for pos in (lowered.find(word) for word in words) if pos >= 0]
+        start = max(0, min(positions, default=0) - SNIPPET_CHARS // 3)
+        excerpt = " ".join(text[start:start + SNIPPET_CHARS * 2].split())[:SNIPPET_CHARS]
+        return ("…" if start > 0 else "") + excerpt
+
+def build_text_index(path):
+    """Extract the text of every page and index it (runs in a worker process)."""
+    with fitz.open(path) as document:
+        return TextIndex([page.get_text() for page in document])
+
+class TextIndexer:
+    """Build deck text indexes in a background process.
+
+    Extraction reads the whole deck, so it runs in its own process rather
+    than on the render worker (PyMuPDF is not thread-safe). The finished
+    index is handed to ``on_ready(document_id, index)`` from a pool callback
+    thread; starting another deck or calling cancel() ignores a build still
+    in flight.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.future = None
+        self.generation = 0
+        self.indexes = OrderedDict()  # {document_id: TextIndex}
+        self.lock = threading.Lock()
+
+    def start(self, path, document_id, on_ready):
+        self.cancel()
+        with self.lock:
+            index = self.indexes.get(document_id)
+            if index is not None:
+                self.indexes.move_to_end(document_id)
+            generation = self.generation
+        if index is not None:
+            on_ready(document_id, index)
+            return
+        if self.executor is None:
+            # spawn: never fork a process that is running Tk and server threads
+            self.executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        future = self.executor.submit(build_text_index, path)
+        future.add_done_callback(lambda f: self._finished(f, generation, document_id, on_ready))
+        with self.lock:
+            self.future = future
+
+    def _finished(self, future, generation, document_id, on_ready):
+        if future.cancelled():
+            return
+        try:
+            index = future.result()
+        except Exception as e:
+            print(f"Error indexing PDF text: {e}")
+            return
+        with self.lock:
+            self.indexes[document_id] = index
+            while len(self.indexes) > INDEX_CACHE_DECKS:
+                self.indexes.popitem(last=False)
+            if generation != self.generation:
+                return
+        on_ready(document_id, index)
+
+    def cancel(self):
+        """Ignore the build in flight (and drop it if it has not started)."""
+        with self.lock:
+            self.generation += 1
+            future, self.future = self.future, None
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+from PIL import Image
+
+from page_cache import PageCache
+from page_render import render_page_to_box
+
+# Thumbnails in the sidebar navigator are fitted into this box
+THUMBNAIL_WIDTH = 128
+THUMBNAIL_HEIGHT = 96
+
+# Rendered thumbnails are kept on disk per document, so reopening a deck is instant
+THUMBNAIL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thumbnails")
+# Decks whose thumbnails stay on disk (least recently opened are pruned)
+THUMBNAIL_DOCUMENTS = 50
+
+# Memory budget for decoded thumbnails
+THUMBNAIL_CACHE_BUDGET = 32 * 1024 * 1024  # bytes
+
+class ThumbnailStore:
+    """Page thumbnails cached in memory and on disk, keyed by document hash.
+
+    Each deck gets a directory ``<sha256>_<width>x<height>`` with one PNG per
+    page. ``thumbnail`` renders a missing page and is meant for the render
+    worker (it touches the fitz document); ``cached`` only looks in memory and
+    is safe on the Tk thread.
+    """
+
+    def __init__(self, directory=THUMBNAIL_DIR, size=(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT),
+                 max_documents=THUMBNAIL_DOCUMENTS, budget=THUMBNAIL_CACHE_BUDGET):
+        self.directory = directory
+        self.size = size
+        self.max_documents = max_documents
+        self.images = PageCache(budget)
+
+    def _document_dir(self, document_id):
+        width, height = self.size
+        return os.path.join(self.directory, f"{document_id}_{width}x{height}")
+
+    def _key(self, document_id, page_num):
+        return (document_id, page_num, ("thumbnail",) + tuple(self.size))
+
+    def open_document(self, document_id):
+        """Mark a deck as recently used and prune the thumbnails of old ones."""
+        document_dir = self._document_dir(document_id)
+        os.makedirs(document_dir, exist_ok=True)
+        os.utime(document_dir)
+        decks = sorted((os.path.join(self.directory, name) for name in os.listdir(self.directory)),
+                       key=os.path.getmtime, reverse=True)
+        for stale in decks[self.max_documents:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def cached(self, document_id, page_num):
+        """The thumbnail of a page if it is in memory, else None."""
+        return self.images.get(self._key(document_id, page_num))
+
+    def thumbnail(self, document, document_id, page_num):
+        """Return a page thumbnail from memory or disk, rendering and saving it on a miss."""
+        key = self._key(document_id, page_num)
+        img = self.images.get(key)
+        if img is not None:
+            return img
+        path = os.path.join(self._document_dir(document_id), f"{page_num}.png")
+        try:
+            with Image.open(path) as stored:
+                img = stored.convert("RGB")
+        except (OSError, ValueError):
+            img = render_page_to_box(document, page_num, *self.size)
+            self._save(img, path)
+        self.images.put(key, img)
+        return img
+
+    def _save(self, img, path):
+        # Written under a temporary name first, so a crash never leaves a truncated PNG behind
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        except OSError as e:
+            print(f"Warning: could not save thumbnail {path}: {e}")
+            return
+        try:
+            with os.fdopen(fd, "wb") as target:
+                img.save(target, "PNG")
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: could not save thumbnail {path}: {e}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
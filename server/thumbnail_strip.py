@@ -0,0 +1,173 @@
+from tkinter import Canvas, Frame, ttk
+from PIL import ImageTk
+
+from thumbnail_store import THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT
+
+# Grid layout of the navigator: gap between cells and room for the page number
+THUMBNAIL_PADDING = 8
+THUMBNAIL_LABEL_HEIGHT = 14
+# Rows beyond the visible ones whose thumbnails are requested ahead of scrolling
+THUMBNAIL_LOOKAHEAD_ROWS = 2
+
+class ThumbnailStrip:
+    """Scrollable grid of page thumbnails, loaded lazily as they scroll into view.
+
+    Every page gets a placeholder cell up front; images are only asked for
+    (``request(page_num)``) for the visible rows plus a few ahead, and come
+    back through ``set_thumbnail``. Cells that scroll away before their image
+    arrives are withdrawn with ``cancel(page_num)``. Clicking a cell calls
+    ``on_select(page_num)``.
+    """
+
+    def __init__(self, parent, width, height, request, cancel, on_select):
+        self.request = request
+        self.cancel = cancel
+        self.on_select = on_select
+
+        self.frame = Frame(parent, bg="white")
+        self.canvas = Canvas(self.frame, width=width, height=height, bg="#f7f7f7", highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", self.on_configure)
+        self.canvas.bind("<Button-1>", self.on_click)
+        # Scroll the strip itself rather than the sidebar around it
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+
+        self.cell_width = THUMBNAIL_WIDTH + THUMBNAIL_PADDING
+        self.cell_height = THUMBNAIL_HEIGHT + THUMBNAIL_LABEL_HEIGHT + THUMBNAIL_PADDING
+        self.columns = self.columns_for(width)
+        self.total_pages = 0
+        self.selected = None
+        self.images = {}  # {page: PhotoImage shown in its cell}
+        self.pending = set()  # pages requested but not delivered yet
+
+    def columns_for(self, width):
+        return max(1, (width - THUMBNAIL_PADDING) // self.cell_width)
+
+    def cell_origin(self, page_num):
+        row, column = divmod(page_num, self.columns)
+        return (THUMBNAIL_PADDING + column * self.cell_width, THUMBNAIL_PADDING + row * self.cell_height)
+
+    def load(self, total_pages):
+        """Lay out placeholder cells for a new deck and load the visible thumbnails."""
+        self.clear()
+        self.total_pages = total_pages
+        self.layout()
+        self.canvas.yview_moveto(0)
+        self.load_visible()
+
+    def clear(self):
+        for page_num in self.pending:
+            self.cancel(page_num)
+        self.pending.clear()
+        self.images.clear()
+        self.canvas.delete("all")
+        self.total_pages = 0
+        self.selected = None
+
+    def layout(self):
+        """(Re)draw every cell; thumbnails already delivered are kept."""
+        self.canvas.delete("all")
+        for page_num in range(self.total_pages):
+            x, y = self.cell_origin(page_num)
+            self.canvas.create_rectangle(x, y, x + THUMBNAIL_WIDTH, y + THUMBNAIL_HEIGHT,
+                                         fill="white", outline="#d0d0d0", tags=("frame", f"frame:{page_num}"))
+            self.canvas.create_text(x + THUMBNAIL_WIDTH // 2, y + THUMBNAIL_HEIGHT + THUMBNAIL_LABEL_HEIGHT // 2 + 1,
+                                    text=str(page_num + 1), font=("Arial", 8), fill="#7f8c8d")
+            if page_num in self.images:
+                self.draw_image(page_num)
+        rows = -(-self.total_pages // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_width + THUMBNAIL_PADDING,
+                                            rows * self.cell_height + THUMBNAIL_PADDING))
+        if self.selected is not None:
+            self.highlight(self.selected)
+
+    def draw_image(self, page_num):
+        x, y = self.cell_origin(page_num)
+        self.canvas.create_image(x + THUMBNAIL_WIDTH // 2, y + THUMBNAIL_HEIGHT // 2,
+                                 image=self.images[page_num], tags=f"image:{page_num}")
+        # The cell frame becomes an outline over the image, so the selection highlight stays visible
+        self.canvas.itemconfig(f"frame:{page_num}", fill="")
+        self.canvas.tag_raise(f"frame:{page_num}")
+
+    def visible_pages(self):
+        """Pages in the rows on screen, plus a few rows either side."""
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row = max(0, int(top // self.cell_height) - THUMBNAIL_LOOKAHEAD_ROWS)
+        last_row = int(bottom // self.cell_height) + THUMBNAIL_LOOKAHEAD_ROWS
+        return range(first_row * self.columns, min(self.total_pages, (last_row + 1) * self.columns))
+
+    def load_visible(self):
+        """Request thumbnails that came into view; withdraw requests that scrolled out of it."""
+        visible = self.visible_pages()
+        for page_num in list(self.pending):
+            if page_num not in visible:
+                self.pending.discard(page_num)
+                self.cancel(page_num)
+        for page_num in visible:
+            if page_num not in self.images and page_num not in self.pending:
+                self.pending.add(page_num)
+                self.request(page_num)
+
+    def requeue(self):
+        """Withdraw and re-request outstanding thumbnails, so work queued since runs first."""
+        for page_num in self.pending:
+            self.cancel(page_num)
+        self.pending.clear()
+        self.load_visible()
+
+    def set_thumbnail(self, page_num, img):
+        """Show a delivered thumbnail (Tk thread)."""
+        self.pending.discard(page_num)
+        if page_num >= self.total_pages or page_num in self.images:
+            return
+        self.images[page_num] = ImageTk.PhotoImage(img)
+        self.draw_image(page_num)
+
+    def select(self, page_num):
+        """Highlight the page being shown and scroll it into view."""
+        if self.selected is not None:
+            self.canvas.itemconfig(f"frame:{self.selected}", outline="#d0d0d0", width=1)
+        self.selected = page_num
+        if page_num is None or page_num >= self.total_pages:
+            return
+        self.highlight(page_num)
+        _, y = self.cell_origin(page_num)
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        rows = -(-self.total_pages // self.columns)
+        total_height = rows * self.cell_height + THUMBNAIL_PADDING
+        if height > 1 and (y < top or y + self.cell_height > top + height):
+            self.canvas.yview_moveto(max(0, y - THUMBNAIL_PADDING) / total_height)
+
+    def highlight(self, page_num):
+        self.canvas.itemconfig(f"frame:{page_num}", outline="#2980b9", width=3)
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.load_visible()
+
+    def on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        return "break"
+
+    def on_configure(self, event):
+        columns = self.columns_for(event.width)
+        if columns != self.columns:
+            self.columns = columns
+            self.layout()
+        self.load_visible()
+
+    def on_click(self, event):
+        x = self.canvas.canvasx(event.x) - THUMBNAIL_PADDING
+        y = self.canvas.canvasy(event.y) - THUMBNAIL_PADDING
+        if x < 0 or y < 0:
+            return
+        column, row = int(x // self.cell_width), int(y // self.cell_height)
+        page_num = row * self.columns + column
+        if column < self.columns and page_num < self.total_pages:
+            self.on_select(page_num)
@@ -1,18 +1,50 @@
-from tkinter import Tk, Canvas, Button, filedialog, ttk, Frame, Label, StringVar, Scale, HORIZONTAL, IntVar, Entry
+from tkinter import Tk, Canvas, Button, filedialog, ttk, Frame, Label, StringVar, Scale, HORIZONTAL, IntVar, Entry, Listbox
 import time
 import threading
-import io
+import itertools
+import queue
 from PIL import Image, ImageTk
-import base64
-import fitz  # PyMuPDF for PDF handling
 
 from voice_chat import VoiceChat
 from connection_manager import ConnectionRequestPanel, ConnectedClientPanel
-from server import socketio, coordinates_queue, connected_clients
+from server import socketio, coordinates_queue, connected_clients, broadcast_stroke, stroke_store, send_stroke_snapshot, next_stroke_id
+from server import set_coordinates_wakeup, update_coordinate_metrics, coordinates_consumed, broadcaster
+from server import page_tier, page_tiers_in_use, deliver_page, deliver_pdf
+from server import deliver_preview, is_progressive, progressive_tiers_in_use, pdf_distributor, asset_store
+from broadcaster import VIEWERS_ROOM, tier_room
+from stroke_batcher import StrokeBatcher, BATCH_INTERVAL
+from stroke_simplify import StrokeSimplifier
+from annotation_model import AnnotationModel
+from page_cache import PageCache, display_key, wire_key, tiles_key, preview_key
+from page_render import render_page_to_box, render_wire_page, DEFAULT_WIRE_TIER
+from page_codec import encode_wire_page, encode_preview, encode_tiles, DEFAULT_CODEC_TIER
+from prerender import PrerenderPipeline, prerender_window
+from render_service import RenderService, DocumentChanged
+from single_flight import SingleFlight
+from thumbnail_store import ThumbnailStore
+from thumbnail_strip import ThumbnailStrip
+from text_index import TextIndexer
 
 # Global reference for connection_manager to access voice_chat
 whiteboard_instance = None
 
+# Long strokes continue in a fresh canvas item so coords() updates stay cheap
+MAX_POLYLINE_POINTS = 256
+
+# Coordinate drain: time budget per Tk frame, pause between slices, fallback poll
+DRAIN_BUDGET = 0.008  # seconds
+DRAIN_YIELD_MS = 8
+DRAIN_FALLBACK_MS = 250
+
+# Resolution tier pre-rendered for the whole deck (see page_render.WIRE_TIERS);
+# other tiers are rendered on demand for the viewers that need them
+WIRE_TIER = DEFAULT_WIRE_TIER
+# Image quality of those page images (see page_codec.CODEC_TIERS)
+WIRE_CODEC = DEFAULT_CODEC_TIER
+
+# Height of the page thumbnail navigator in the sidebar
+THUMBNAIL_STRIP_HEIGHT = 330
+
 class CollaborativeWhiteboard:
     def __init__(self, root, host_ip):
         self.root = root
@@ -139,7 +171,13 @@ class CollaborativeWhiteboard:
         self.clients_var = StringVar(value="Connected Clients: 0")
         Label(self.connection_frame, textvariable=self.clients_var, 
               font=("Arial", 9), bg="white", fg="#3498db",
-              wraplength=self.content_width).pack(pady=(2,8))
+              wraplength=self.content_width).pack(pady=(2,4))
+        
+        # Stroke queue metrics (depth and processing lag)
+        self.queue_metrics_var = StringVar(value="Stroke queue: 0 | lag: 0 ms")
+        Label(self.connection_frame, textvariable=self.queue_metrics_var,
+              font=("Arial", 8), bg="white", fg="#7f8c8d",
+              wraplength=self.content_width).pack(pady=(0,8))
         
         
         # Add connection request panel
@@ -209,6 +247,33 @@ class CollaborativeWhiteboard:
         ttk.Button(self.pdf_frame, text="📤 Upload PDF", command=self.upload_pdf).pack(fill="x", padx=8, pady=2)
         ttk.Button(self.pdf_frame, text="🗑️ Clear All", command=self.clear_all).pack(fill="x", padx=8, pady=2)
         
+        # Background pre-render progress
+        self.prerender_var = StringVar(value="")
+        Label(self.pdf_frame, textvariable=self.prerender_var, font=("Arial", 8), bg="white",
+              fg="#7f8c8d", wraplength=self.content_width).pack(pady=(2,0))
+        
+        # Text search: the deck is indexed in the background; hits jump straight to their page
+        Label(self.pdf_frame, text="🔍 Search slides", font=("Arial", 9), bg="white",
+              fg="#2c3e50").pack(anchor="w", padx=8, pady=(8,0))
+        self.search_var = StringVar(value="")
+        search_entry = Entry(self.pdf_frame, textvariable=self.search_var, font=("Arial", 10))
+        search_entry.pack(fill="x", padx=8, pady=2)
+        search_entry.bind("<KeyRelease>", self.search_text)
+        search_entry.bind("<Return>", self.open_first_search_result)
+        self.search_status_var = StringVar(value="")
+        Label(self.pdf_frame, textvariable=self.search_status_var, font=("Arial", 8), bg="white",
+              fg="#7f8c8d", wraplength=self.content_width).pack(anchor="w", padx=8)
+        self.search_results_list = Listbox(self.pdf_frame, height=5, font=("Arial", 9), activestyle="none")
+        self.search_results_list.pack(fill="x", padx=8, pady=2)
+        self.search_results_list.bind("<<ListboxSelect>>", self.open_selected_search_result)
+        self.search_results = []  # [(page, snippet)] shown in the list
+        
+        # Page navigator: thumbnails are rendered lazily as they scroll into view
+        self.thumbnail_store = ThumbnailStore()
+        self.thumbnail_strip = ThumbnailStrip(self.pdf_frame, self.content_width - 20, THUMBNAIL_STRIP_HEIGHT,
+                                              self.request_thumbnail, self.cancel_thumbnail, self.go_to_page)
+        self.thumbnail_strip.frame.pack(fill="x", padx=8, pady=(6,0))
+        
         Frame(self.pdf_frame, bg="white", height=8).pack()  # Bottom padding
         
         # Add extra spacer at the very end to ensure everything is scrollable
@@ -219,10 +284,14 @@ class CollaborativeWhiteboard:
         self.left_canvas.configure(scrollregion=self.left_canvas.bbox("all"))
 
         
-        # Drawing variables
-        self.prev_x = None
-        self.prev_y = None
+        # Drawing variables (one polyline canvas item per stroke)
+        self.local_stroke = None
+        self.remote_strokes = {}  # {sender sid: drawing state of its current stroke}
+        self.annotations = AnnotationModel()
         self.drawing = False
+        self.stroke_batcher = StrokeBatcher(self.send_stroke_batch, id_source=next_stroke_id)
+        self.stroke_simplifier = StrokeSimplifier()
+        self.batch_flush_pending = None
         self.current_image_tk = None
         self.image_width = self.canvas_width  # Default to canvas size
         self.image_height = self.canvas_height
@@ -230,17 +299,35 @@ class CollaborativeWhiteboard:
         self.y_offset = 0
         
         # PDF Variables
-        self.pdf_document = None
+        self.document_id = None  # SHA-256 of the open PDF, used as its cache key (None when no PDF is loaded)
+        self.render_service = RenderService(self.root)
+        self.last_published_page = {}  # {tier: (page, content hash) last sent as change_page}
+        self.last_published_preview = None  # (page, content hash) last sent as page_preview
+        self.state_sync_flights = SingleFlight()
+        self.state_sync_rooms = itertools.count(1)
+        self.page_cache = PageCache()
+        self.prerender = PrerenderPipeline()
+        self.prerender_path = None  # deck being pre-rendered, and the page/size of its window
+        self.prerender_center = 0
+        self.prerender_window = 0
+        self.prerender_progress_scheduled = False
+        self.text_indexer = TextIndexer()
+        self.text_index = None  # TextIndex of the open PDF, once built
         self.current_page = 0
         self.total_pages = 0
+        self.publish_pending_page = None  # page whose publishing render is still on the worker
         
         # Bind mouse events
         self.canvas.bind("<Button-1>", self.start_draw)
         self.canvas.bind("<B1-Motion>", self.draw)
         self.canvas.bind("<ButtonRelease-1>", self.stop_draw)
         
-        # Start the coordinate processing (reduced frequency for better performance)
-        self.root.after(100, self.process_coordinates)
+        # Drain coordinates when the server signals new data (with a slow fallback poll)
+        self.drain_scheduled = False
+        self.drain_lock = threading.Lock()
+        self.last_drain_lag_ms = 0.0
+        set_coordinates_wakeup(self.wake_coordinate_drain)
+        self.root.after(DRAIN_FALLBACK_MS, self.poll_coordinates)
         # Start audio level update
         # Start connected clients counter update
         self.root.after(1000, self.update_client_count)
@@ -264,36 +351,62 @@ class CollaborativeWhiteboard:
             client_id = request.sid
             print(f"Sending current PDF state to client {client_id}")
             
-            if self.pdf_document and self.total_pages > 0:
-                # Re-render current page and send to this specific client
-                try:
-                    page = self.pdf_document[self.current_page]
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    
-                    # Send as page image (not full PDF to save bandwidth)
-                    buffer = io.BytesIO()
-                    img.save(buffer, format="PNG")
-                    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                    
-                    server_socketio.emit("change_page", {
-                        "page_image": img_base64,
-                        "page_number": self.current_page,
-                        "canvas_width": pix.width,
-                        "canvas_height": pix.height
-                    }, room=client_id)
-                    
-                    # Also send PDF metadata
-                    server_socketio.emit("pdf_metadata", {
-                        "total_pages": self.total_pages,
-                        "current_page": self.current_page
-                    }, room=client_id)
-                    
-                    print(f"Sent current PDF state to {client_id}: page {self.current_page+1}/{self.total_pages}")
-                except Exception as e:
-                    print(f"Error sending current state to {client_id}: {e}")
-            else:
+            if not (self.document_id and self.total_pages > 0):
                 print(f"No PDF loaded, nothing to send to {client_id}")
+                # Annotations already on the board, in one message
+                send_stroke_snapshot(client_id)
+                return
+            
+            # Concurrent requests for the same page share one render/encode and one emit
+            key = (self.document_id, self.current_page, page_tier(client_id), is_progressive(client_id))
+            if self.state_sync_flights.join(key, client_id):
+                self.send_current_state(key)
+    
+    def send_current_state(self, key):
+        """Render (or fetch) a page once and send it to every client waiting on it (Socket.IO thread)."""
+        document_id, page_num, tier, progressive = key
+        wire_page = wire_tiles = preview = None
+        try:
+            # Send as page image (not full PDF to save bandwidth), cached across requests
+            wire_page, wire_tiles = self.get_wire_page(document_id, page_num, tier, progressive)
+            if progressive:
+                preview = self.page_cache.get(preview_key(document_id, page_num))
+        except DocumentChanged:
+            # A new deck was opened meanwhile; its first page reaches these clients with the broadcast
+            print(f"Deck changed while rendering current state for page {page_num+1}, not sending it")
+        except Exception as e:
+            print(f"Error rendering current state for page {page_num+1}: {e}")
+        finally:
+            # Requests that joined while rendering are served by this result too
+            waiters = self.state_sync_flights.finish(key)
+        broadcaster.submit(self.deliver_current_state, waiters, page_num, wire_page, wire_tiles, preview)
+    
+    def deliver_current_state(self, waiters, page_num, wire_page, wire_tiles, preview):
+        """Emit the current state once to a room of all waiting clients (runs on the broadcast worker)."""
+        room = f"state_sync:{next(self.state_sync_rooms)}"
+        for sid in waiters:
+            broadcaster.enter_room(sid, room)
+        try:
+            if wire_page is not None:
+                if preview is not None:
+                    deliver_preview(preview, page_num, room)
+                deliver_page(wire_page, page_num, room, wire_tiles)
+                
+                # Also send PDF metadata
+                socketio.emit("pdf_metadata", {
+                    "total_pages": self.total_pages,
+                    "current_page": page_num
+                }, room=room)
+                print(f"Sent current PDF state to {len(waiters)} client(s): page {page_num+1}/{self.total_pages}")
+        except Exception as e:
+            print(f"Error sending current state: {e}")
+        finally:
+            for sid in waiters:
+                broadcaster.leave_room(sid, room)
+        
+        # Annotations already on the board, in one message each
+        for sid in waiters:
+            send_stroke_snapshot(sid)
     
     def refresh_connection_requests(self):
         """Refresh the connection request panel."""
@@ -304,6 +417,8 @@ class CollaborativeWhiteboard:
         """Update the connected clients counter"""
         count = len(connected_clients)
         self.clients_var.set(f"Connected Clients: {count}")
+        self.queue_metrics_var.set(
+            f"Stroke queue: {coordinates_queue.qsize()} | lag: {self.last_drain_lag_ms:.0f} ms")
         self.root.after(1000, self.update_client_count)
     
     def disconnect_voice(self):
@@ -334,26 +449,12 @@ class CollaborativeWhiteboard:
         norm_x = max(0, min(1, norm_x))
         norm_y = max(0, min(1, norm_y))
         
-        # Reset previous point
-        self.prev_x = x
-        self.prev_y = y
-        
-        # Draw a point
-        self.canvas.create_oval(
-            x - self.line_width / 2, y - self.line_width / 2,
-            x + self.line_width / 2, y + self.line_width / 2,
-            fill=self.pen_color, outline=self.pen_color, tags="annotation"
-        )
+        # Start a new polyline; round caps render the initial dot
+        self.local_stroke = self.begin_polyline(norm_x, norm_y, self.line_width, self.pen_color)
         
-        # Send to Flask server
-        data = {
-            "x": norm_x,
-            "y": norm_y,
-            "is_start": True,
-            "line_width": self.line_width,
-            "pen_color": self.pen_color
-        }
-        socketio.emit("coordinate_update", data)
+        # Open a new batched stroke and start the periodic flush
+        self.stroke_batcher.begin_stroke(norm_x, norm_y, self.line_width, self.pen_color)
+        self.schedule_batch_flush()
     
     def draw(self, event):
         """Continue drawing on mouse drag"""
@@ -370,132 +471,471 @@ class CollaborativeWhiteboard:
         norm_x = max(0, min(1, norm_x))
         norm_y = max(0, min(1, norm_y))
         
-        # Draw a line segment with smooth, rounded appearance
-        if self.prev_x is not None and self.prev_y is not None:
-            self.canvas.create_line(
-                self.prev_x, self.prev_y, x, y, 
-                fill=self.pen_color, width=self.line_width,
-                capstyle="round", joinstyle="round",
-                tags="annotation"
-            )
-        
-        # Draw endpoint
-        self.canvas.create_oval(
-            x - self.line_width / 2, y - self.line_width / 2,
-            x + self.line_width / 2, y + self.line_width / 2,
-            fill=self.pen_color, outline=self.pen_color, tags="annotation"
-        )
-        
-        # Update previous point
-        self.prev_x = x
-        self.prev_y = y
+        # Extend the stroke's polyline
+        if self.local_stroke is not None:
+            self.extend_polyline(self.local_stroke, norm_x, norm_y)
         
-        # Send to Flask server
-        data = {
-            "x": norm_x,
-            "y": norm_y,
-            "is_start": False,
-            "line_width": self.line_width,
-            "pen_color": self.pen_color
-        }
-        socketio.emit("coordinate_update", data)
+        # Queue the point; the batcher emits once the batch is full or due
+        self.stroke_batcher.add_point(norm_x, norm_y)
     
     def stop_draw(self, event):
         """Stop drawing on mouse release"""
         self.drawing = False
-        self.prev_x = None
-        self.prev_y = None
+        self.local_stroke = None
+        
+        # Flush the remaining points right away so the stroke end is not delayed
+        if self.batch_flush_pending:
+            self.root.after_cancel(self.batch_flush_pending)
+            self.batch_flush_pending = None
+        self.stroke_batcher.end_stroke()
+    
+    def to_canvas(self, norm_x, norm_y):
+        """Convert normalized page coordinates (0-1) to canvas coordinates."""
+        return norm_x * self.image_width + self.x_offset, norm_y * self.image_height + self.y_offset
+    
+    def begin_polyline(self, norm_x, norm_y, line_width, pen_color):
+        """Create the canvas item for a new stroke and return its drawing state."""
+        x, y = self.to_canvas(norm_x, norm_y)
+        item = self.canvas.create_line(
+            x, y, x, y,
+            fill=pen_color, width=line_width,
+            capstyle="round", joinstyle="round", smooth=True,
+            tags="annotation"
+        )
+        self.annotations.add(item, norm_x, norm_y, line_width, self.image_width)
+        return {"item": item, "coords": [x, y], "line_width": line_width, "pen_color": pen_color,
+                "last": (norm_x, norm_y)}
+    
+    def extend_polyline(self, stroke, norm_x, norm_y):
+        """Append a normalized point to a stroke's polyline item."""
+        if len(stroke["coords"]) >= MAX_POLYLINE_POINTS * 2:
+            # Continue in a new item from the last point
+            last_x, last_y = stroke["last"]
+            stroke.update(self.begin_polyline(last_x, last_y, stroke["line_width"], stroke["pen_color"]))
+        
+        x, y = self.to_canvas(norm_x, norm_y)
+        stroke["coords"].extend((x, y))
+        stroke["last"] = (norm_x, norm_y)
+        self.annotations.extend(stroke["item"], norm_x, norm_y)
+        self.canvas.coords(stroke["item"], *stroke["coords"])
+    
+    def schedule_batch_flush(self):
+        """Periodically flush partially filled stroke batches while drawing."""
+        if self.batch_flush_pending:
+            self.root.after_cancel(self.batch_flush_pending)
+        self.batch_flush_pending = self.root.after(int(BATCH_INTERVAL * 1000), self.flush_stroke_batch)
+    
+    def flush_stroke_batch(self):
+        """Timer callback: send points that have waited a full batch interval."""
+        self.batch_flush_pending = None
+        if not self.stroke_batcher.active:
+            return
+        self.stroke_batcher.flush_if_due()
+        self.schedule_batch_flush()
+    
+    def send_stroke_batch(self, batch):
+        """Simplify a batch of stroke points and broadcast it to all clients."""
+        batch = self.stroke_simplifier.simplify("teacher", batch)
+        if batch is not None:
+            stroke_store.record(batch, "teacher")
+            broadcast_stroke(batch)
     
     def upload_pdf(self):
         """Upload and display a PDF document."""
         file_path = filedialog.askopenfilename(filetypes=[("PDF Files", "*.pdf")])
         if not file_path:
             return
-
+        
+        # Importing and opening happen on the render worker; the deck is shown once it is ready
+        self.render_service.cancel()
+        self.render_service.request("document", self.import_pdf, file_path,
+                                    on_done=lambda result: self.pdf_opened(*result))
+    
+    def import_pdf(self, _document, file_path):
+        """Copy a PDF into the asset store (once per content) and open it (runs on the render worker)."""
+        digest, stored_path = asset_store.add_file(file_path, "application/pdf")
         try:
-            # Open the PDF file
-            self.pdf_document = fitz.open(file_path)
-            self.total_pages = len(self.pdf_document)
+            self.thumbnail_store.open_document(digest)
+        except OSError as e:
+            print(f"Warning: thumbnail cache unavailable: {e}")
+        return stored_path, digest, self.render_service.load(stored_path, digest)
+    
+    def pdf_opened(self, file_path, digest, total_pages):
+        """Show a freshly opened PDF (runs on the Tk thread)."""
+        try:
+            self.prerender.cancel()
+            self.prerender_path = None
+            # Keyed by content, so re-uploading a deck reuses every cached render
+            self.document_id = digest
+            self.total_pages = total_pages
             self.current_page = 0
             
             # Update page counter
             self.page_var.set(1)  # Display is 1-based
             self.total_pages_var.set(f"/ {self.total_pages}")
+            self.thumbnail_strip.load(self.total_pages)
             
-            # Read PDF to memory buffer for sending
-            with open(file_path, "rb") as pdf_file:
-                pdf_bytes = pdf_file.read()
-                pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
+            # Build the search index off the Tk thread and the render worker
+            self.text_index = None
+            self.clear_search_results()
+            self.search_status_var.set("Indexing text…")
+            self.text_indexer.start(file_path, digest, self.text_index_ready)
             
             # Send PDF to ALL connected clients (not just approved ones)
             # Students should see PDFs even in view-only mode
-            print(f"Emitting new_pdf event to all clients: {self.total_pages} pages")
-            socketio.emit("new_pdf", {
-                "pdf_data": pdf_base64,
-                "total_pages": self.total_pages,
-                "current_page": self.current_page
-            })
-            print("new_pdf event emitted successfully")
+            # Reading and encoding happen on the broadcast worker, not the Tk thread
+            broadcaster.submit(self.publish_pdf, digest, self.total_pages, self.current_page)
             
             # Display first page
             self.render_pdf_page(self.current_page)
             
+            # Render the rest of the deck in the background
+            self.start_prerender(file_path)
+            
             print(f"PDF uploaded: {file_path}, {self.total_pages} pages")
         except Exception as e:
             print(f"Error uploading PDF: {e}")
     
-    def render_pdf_page(self, page_num):
-        """Render a specific PDF page to the canvas."""
-        if not self.pdf_document or page_num < 0 or page_num >= self.total_pages:
-            return
+    def start_prerender(self, file_path):
+        """Pre-render the pages around the current one on the process pool, nearest pages first.
+        
+        The window is sized to fit half the page cache (see prerender_window) and
+        follows the teacher through the deck (see follow_prerender).
+        """
+        document_id = self.document_id
+        width, height = self.canvas_width, self.canvas_height
+        window = prerender_window(self.page_cache.budget, (width, height))
+        
+        def is_cached(page_num):
+            return (wire_key(document_id, page_num, WIRE_TIER, WIRE_CODEC) in self.page_cache and
+                    display_key(document_id, page_num, width, height) in self.page_cache)
+        
+        def store(page_num, display, wire_page):
+            # Runs on a pool callback thread; the page cache is thread-safe
+            self.page_cache.put(display_key(document_id, page_num, width, height), display)
+            self.page_cache.put(wire_key(document_id, page_num, WIRE_TIER, WIRE_CODEC), wire_page)
         
         try:
-            # Get the page
-            page = self.pdf_document[page_num]
-            
-            # Convert to an image with higher resolution for clarity
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-            
-            # Convert to PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # Preserve original dimensions for proper mapping
-            original_width, original_height = img.size
+            self.prerender.start(file_path, self.total_pages, self.current_page, (width, height),
+                                 WIRE_TIER, WIRE_CODEC, store, skip=is_cached, max_pages=window)
+        except Exception as e:
+            print(f"Error starting pre-render: {e}")
+            return
+        self.prerender_path = file_path
+        self.prerender_center = self.current_page
+        self.prerender_window = window
+        if not self.prerender_progress_scheduled:
+            self.update_prerender_progress()
+    
+    def follow_prerender(self, page_num):
+        """Re-centre the pre-render window once the teacher has moved a quarter of it away."""
+        if (self.prerender_path and self.prerender_window < self.total_pages and
+                abs(page_num - self.prerender_center) > self.prerender_window // 4):
+            self.start_prerender(self.prerender_path)
+    
+    def update_prerender_progress(self):
+        """Show pre-render progress in the sidebar until the run finishes or is cancelled."""
+        self.prerender_progress_scheduled = False
+        done, total = self.prerender.progress()
+        if total == 0:
+            self.prerender_var.set("")
+            return
+        if done >= total:
+            self.prerender_var.set(f"Pre-rendered {total} page(s)")
+            return
+        self.prerender_var.set(f"Pre-rendering pages: {done}/{total}")
+        self.prerender_progress_scheduled = True
+        self.root.after(500, self.update_prerender_progress)
+    
+    def text_index_ready(self, document_id, index):
+        """Hand a finished text index to the Tk thread (called from a pool thread)."""
+        try:
+            self.root.after(0, lambda: self.use_text_index(document_id, index))
+        except RuntimeError:
+            print("Warning: Tk not reachable, dropping text index")
+    
+    def use_text_index(self, document_id, index):
+        if document_id != self.document_id:
+            return
+        self.text_index = index
+        self.search_status_var.set(f"Indexed text of {len(index)} page(s)")
+        # Anything typed while indexing is searched now
+        self.search_text()
+    
+    def search_text(self, event=None):
+        """List the pages matching the search box and pre-warm the render of the best hit."""
+        query = self.search_var.get()
+        if self.text_index is None or not query.strip():
+            self.clear_search_results()
+            return
+        start = time.perf_counter()
+        results = self.text_index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.search_status_var.set(f"{len(results)} page(s) found in {elapsed_ms:.1f} ms")
+        if results == self.search_results:
+            return
+        self.clear_search_results()
+        self.search_results = results
+        for page_num, snippet in results:
+            self.search_results_list.insert("end", f"{page_num + 1}: {snippet}")
+        if results:
+            self.prewarm_page(results[0][0])
+    
+    def clear_search_results(self):
+        self.search_results = []
+        self.search_results_list.delete(0, "end")
+    
+    def open_first_search_result(self, event=None):
+        self.search_text()
+        if self.search_results:
+            self.go_to_page(self.search_results[0][0])
+    
+    def open_selected_search_result(self, event=None):
+        selection = self.search_results_list.curselection()
+        if selection and selection[0] < len(self.search_results):
+            self.go_to_page(self.search_results[selection[0]][0])
+    
+    def prewarm_page(self, page_num):
+        """Render a page into the cache ahead of a likely jump (a newer pre-warm supersedes it)."""
+        if not self.document_id or page_num == self.current_page:
+            return
+        self.render_service.request("prewarm", self.render_prewarm, self.document_id, page_num,
+                                    self.canvas_width, self.canvas_height)
+    
+    def render_prewarm(self, document, document_id, page_num, width, height):
+        """Cache the display image and every wire tier viewers need for a page (runs on the render worker)."""
+        self.render_frame(document, document_id, page_num, width, height, publish=False)
+        progressive = progressive_tiers_in_use()
+        for tier in page_tiers_in_use():
+            self.render_wire_page(document, document_id, page_num, tier, tier in progressive)
+    
+    def publish_pdf(self, digest, total_pages, current_page):
+        """Send a PDF to all viewers, by URL or inline (runs on the broadcast worker)."""
+        # A new deck starts a new page sequence for clients
+        self.last_published_page.clear()
+        self.last_published_preview = None
+        
+        print(f"Emitting new_pdf event to all clients: {total_pages} pages")
+        deliver_pdf(digest, total_pages, current_page)
+        print("new_pdf event emitted successfully")
+    
+    def publish_page_preview(self, page_num, img):
+        """Send progressive clients a low-resolution preview of a page (runs on the broadcast worker)."""
+        if not progressive_tiers_in_use():
+            return
+        key = preview_key(self.document_id, page_num)
+        preview = self.page_cache.get(key)
+        if preview is None:
+            preview = encode_preview(img)
+            self.page_cache.put(key, preview)
+        
+        # A repeat of the page clients already have must not replace it with the preview
+        published = (page_num, preview["content_hash"])
+        if published == self.last_published_preview:
+            return
+        self.last_published_preview = published
+        deliver_preview(preview, page_num)
+    
+    def publish_page_image(self, page_num):
+        """Send a page image to each viewer tier, sized for that tier (runs on the broadcast worker).
+        
+        This worker also carries every stroke, so it never waits on the render worker:
+        tiers that are not encoded yet are rendered there and published when done.
+        """
+        document_id = self.document_id
+        progressive = progressive_tiers_in_use()
+        wire_pages = {}
+        for tier in page_tiers_in_use():
+            wire_page, wire_tiles = self.cached_wire_page(document_id, page_num, tier, tier in progressive)
+            if wire_page is None:
+                self.render_service.request("publish", self.render_wire_tiers, document_id, page_num,
+                                            on_done=lambda pages: broadcaster.submit(self.deliver_wire_pages,
+                                                                                     page_num, pages))
+                return
+            wire_pages[tier] = (wire_page, wire_tiles)
+        self.render_service.cancel("publish")
+        self.deliver_wire_pages(page_num, wire_pages)
+    
+    def deliver_wire_pages(self, page_num, wire_pages):
+        """Emit change_page to each tier room, skipping tiers that already have the image (broadcast worker)."""
+        if page_num != self.current_page:
+            return  # The teacher has moved on; that page's own publish follows
+        print(f"Emitting change_page event: page {page_num+1}/{self.total_pages}")
+        for tier in sorted(wire_pages):
+            wire_page, wire_tiles = wire_pages[tier]
             
-            # Calculate aspect ratio
-            aspect_ratio = original_width / original_height
-            canvas_aspect = self.canvas_width / self.canvas_height
+            # Viewers in this tier already have this exact image
+            published = (page_num, wire_page["content_hash"])
+            if published == self.last_published_page.get(tier):
+                continue
+            self.last_published_page[tier] = published
             
-            # Resize while preserving aspect ratio
-            if aspect_ratio > canvas_aspect:
-                # Image is wider than canvas (relative to height)
-                new_width = self.canvas_width
-                new_height = int(new_width / aspect_ratio)
-            else:
-                # Image is taller than canvas (relative to width)
-                new_height = self.canvas_height
-                new_width = int(new_height * aspect_ratio)
+            deliver_page(wire_page, page_num, tier_room(tier), wire_tiles)
+        print("change_page event emitted successfully")
+    
+    def cached_wire_page(self, document_id, page_num, tier, tiles=False):
+        """(change_page fields, tiles or None) of a page from the page cache, or (None, None) if not all there."""
+        wire_page = self.page_cache.get(wire_key(document_id, page_num, tier, WIRE_CODEC))
+        wire_tiles = self.page_cache.get(tiles_key(document_id, page_num, tier, WIRE_CODEC)) if tiles else None
+        if wire_page is None or (tiles and wire_tiles is None):
+            return None, None
+        return wire_page, wire_tiles
+    
+    def get_wire_page(self, document_id, page_num, tier=WIRE_TIER, tiles=False):
+        """Return (change_page fields, tiles or None) for a page of a document (blocks; never call from
+        the Tk thread or the broadcast worker). Raises DocumentChanged if that document is no longer open."""
+        wire_page, wire_tiles = self.cached_wire_page(document_id, page_num, tier, tiles)
+        if wire_page is None:
+            wire_page, wire_tiles = self.render_service.call(self.render_wire_page, document_id,
+                                                             page_num, tier, tiles)
+        return wire_page, wire_tiles
+    
+    def render_wire_tiers(self, document, document_id, page_num):
+        """Encode a page for every tier viewers need; returns {tier: (wire page, tiles)} (runs on the render worker)."""
+        progressive = progressive_tiers_in_use()
+        return {tier: self.render_wire_page(document, document_id, page_num, tier, tier in progressive)
+                for tier in page_tiers_in_use()}
+    
+    def render_wire_page(self, document, document_id, page_num, tier, tiles=False):
+        """Rasterize and encode a page at a wire tier (and its tiles) into the page cache (runs on the render worker)."""
+        key = wire_key(document_id, page_num, tier, WIRE_CODEC)
+        wire_page = self.page_cache.get(key)
+        wire_tiles = self.page_cache.get(tiles_key(document_id, page_num, tier, WIRE_CODEC)) if tiles else None
+        if wire_page is None or (tiles and wire_tiles is None):
+            # Never encode another deck's page under this document's key
+            self.render_service.require(document_id)
+            img = render_wire_page(document, page_num, tier)
+            if wire_page is None:
+                wire_page = encode_wire_page(img, WIRE_CODEC)
+                self.page_cache.put(key, wire_page)
+            if tiles and wire_tiles is None:
+                wire_tiles = encode_tiles(img, WIRE_CODEC)
+                self.page_cache.put(tiles_key(document_id, page_num, tier, WIRE_CODEC), wire_tiles)
+        return wire_page, wire_tiles
+    
+    def wire_tiers_cached(self, page_num):
+        """True when every tier (and tile set) that viewers need is already encoded for a page."""
+        progressive = progressive_tiers_in_use()
+        return all(wire_key(self.document_id, page_num, tier, WIRE_CODEC) in self.page_cache and
+                   (tier not in progressive or
+                    tiles_key(self.document_id, page_num, tier, WIRE_CODEC) in self.page_cache)
+                   for tier in page_tiers_in_use())
+    
+    def render_frame(self, document, document_id, page_num, width, height, publish):
+        """Produce the canvas image (and wire encode, if publishing) of a page (runs on the render worker)."""
+        # Requested before a new deck finished opening: never show, cache or publish the new deck under the old key
+        self.render_service.require(document_id)
+        key = display_key(document_id, page_num, width, height)
+        img = self.page_cache.get(key)
+        if img is None:
+            # Rasterize straight at canvas resolution
+            img = render_page_to_box(document, page_num, width, height)
+            self.page_cache.put(key, img)
+        if publish:
+            # The preview goes out now; full-resolution pages follow once encoded
+            broadcaster.submit(self.publish_page_preview, page_num, img)
+            progressive = progressive_tiers_in_use()
+            for tier in page_tiers_in_use():
+                self.render_wire_page(document, document_id, page_num, tier, tier in progressive)
+        return page_num, img
+    
+    def render_pdf_page(self, page_num, publish=True):
+        """Show a PDF page: from the cache immediately, otherwise once the render worker is done.
+        
+        publish=False only rebuilds the local display (e.g. after a resize).
+        """
+        if not self.document_id or page_num < 0 or page_num >= self.total_pages:
+            return
+        
+        # This request replaces any frame still rendering, so a flip waiting to be published stays published
+        if not publish and page_num == self.publish_pending_page:
+            publish = True
+        self.publish_pending_page = page_num if publish else None
+        if publish:
+            self.follow_prerender(page_num)
+        
+        # Strokes drawn from now on belong to this page
+        stroke_store.current_page = page_num
+        broadcaster.set_page(page_num)
+        self.thumbnail_strip.select(page_num)
+        
+        width, height = self.canvas_width, self.canvas_height
+        img = self.page_cache.get(display_key(self.document_id, page_num, width, height))
+        if img is not None and (not publish or self.wire_tiers_cached(page_num)):
+            # Fully cached: no worker round trip, and any in-flight frame is now stale
+            self.render_service.cancel("frame")
+            self.publish_pending_page = None
+            if publish:
+                broadcaster.submit(self.publish_page_preview, page_num, img)
+            self.show_page(page_num, img, publish)
+            return
+        
+        # Until the page is rendered, show its thumbnail scaled up so the jump is immediate
+        thumbnail = self.thumbnail_store.cached(self.document_id, page_num)
+        if publish and thumbnail is not None:
+            self.show_page(page_num, self.scale_to_canvas(thumbnail), publish=False)
+        
+        # Rendering and encoding happen off the Tk thread; a newer page or size supersedes this
+        self.render_service.request("frame", self.render_frame, self.document_id, page_num, width, height, publish,
+                                    on_done=lambda frame: self.frame_rendered(frame, publish))
+        # Thumbnails still waiting on the worker go after this page
+        self.thumbnail_strip.requeue()
+    
+    def frame_rendered(self, frame, publish):
+        if publish:
+            self.publish_pending_page = None
+        self.show_page(*frame, publish)
+    
+    def scale_to_canvas(self, img):
+        """Resize an image to the size a page render fitted to the canvas would have."""
+        zoom = min(self.canvas_width / img.width, self.canvas_height / img.height)
+        return img.resize((max(1, round(img.width * zoom)), max(1, round(img.height * zoom))), Image.BILINEAR)
+    
+    def request_thumbnail(self, page_num):
+        """Have the render worker produce a page thumbnail for the navigator (memory hits are shown at once)."""
+        document_id = self.document_id
+        if document_id is None:
+            return
+        img = self.thumbnail_store.cached(document_id, page_num)
+        if img is not None:
+            self.thumbnail_strip.set_thumbnail(page_num, img)
+            return
+        self.render_service.request(f"thumbnail:{page_num}", self.render_thumbnail, document_id, page_num,
+                                    on_done=lambda result: self.thumbnail_ready(*result))
+    
+    def cancel_thumbnail(self, page_num):
+        self.render_service.cancel(f"thumbnail:{page_num}")
+    
+    def render_thumbnail(self, document, document_id, page_num):
+        """Load or render a page thumbnail (runs on the render worker)."""
+        # A thumbnail of another deck would be cached (and saved to disk) under this document
+        self.render_service.require(document_id)
+        return document_id, page_num, self.thumbnail_store.thumbnail(document, document_id, page_num)
+    
+    def thumbnail_ready(self, document_id, page_num, img):
+        if document_id == self.document_id:
+            self.thumbnail_strip.set_thumbnail(page_num, img)
+    
+    def show_page(self, page_num, img_resized, publish=True):
+        """Put a rendered page on the canvas and, if publish, announce it to clients (Tk thread)."""
+        try:
+            new_width, new_height = img_resized.size
             
-            img_resized = img.resize((new_width, new_height), Image.LANCZOS)
+            # Detect layout changes that require re-projecting annotations
+            geometry_changed = (
+                new_width != self.image_width or new_height != self.image_height or
+                (self.canvas_width - new_width) // 2 != self.x_offset or
+                (self.canvas_height - new_height) // 2 != self.y_offset
+            )
             
-            # SAVE old dimensions BEFORE updating (for scaling annotations)
-            old_image_width = getattr(self, 'image_width', new_width)
-            old_image_height = getattr(self, 'image_height', new_height)  
-            old_x_offset = getattr(self, 'x_offset', (self.canvas_width - new_width) // 2)
-            old_y_offset = getattr(self, 'y_offset', (self.canvas_height - new_height) // 2)
+            old_layout = (self.image_width, self.image_height, self.x_offset, self.y_offset)
             
-            # NOW update to new dimensions
+            # Update to new dimensions
             self.image_width = new_width
             self.image_height = new_height
             self.x_offset = (self.canvas_width - new_width) // 2
             self.y_offset = (self.canvas_height - new_height) // 2
             
-            # Track old dimensions for scaling annotations (REMOVED - now done above)
-            # old_image_width = self.image_width if hasattr(self, 'image_width') else new_width
-            # old_image_height = self.image_height if hasattr(self, 'image_height') else new_height
-            # old_x_offset = self.x_offset if hasattr(self, 'x_offset') else self.x_offset
-            # old_y_offset = self.y_offset if hasattr(self, 'y_offset') else self.y_offset
-            
             # Display image
             self.current_image = img_resized
             self.current_image_tk = ImageTk.PhotoImage(img_resized)
@@ -508,24 +948,13 @@ class CollaborativeWhiteboard:
             # Ensure background is behind all annotations
             self.canvas.tag_lower("pdf_background")
             
-            # Scale existing annotations if dimensions changed
-            if (old_image_width != new_width or old_image_height != new_height or 
-                old_x_offset != self.x_offset or old_y_offset != self.y_offset):
-                self.scale_annotations(old_image_width, old_image_height, old_x_offset, old_y_offset)
+            # Re-project existing annotations if the page moved or changed size
+            if geometry_changed:
+                self.reproject_annotations(*old_layout)
             
             # Send page change to ALL clients (view-only students should see page changes)
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG")
-            img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            print(f"Emitting change_page event: page {page_num+1}/{self.total_pages}")
-            socketio.emit("change_page", {
-                "page_image": img_base64,
-                "page_number": page_num,
-                "canvas_width": original_width,
-                "canvas_height": original_height
-            })
-            print("change_page event emitted successfully")
+            if publish:
+                broadcaster.submit(self.publish_page_image, page_num)
             
             print(f"Displayed PDF page {page_num+1}/{self.total_pages}")
         except Exception as e:
@@ -558,95 +987,57 @@ class CollaborativeWhiteboard:
                 self.canvas_width = new_width
                 self.canvas_height = new_height
                 
-                # Re-render current PDF page if one is loaded
-                if self.pdf_document and hasattr(self, 'current_page'):
-                    self.render_pdf_page(self.current_page)
+                # Re-layout the current PDF page locally; clients keep the image they have
+                if self.document_id and hasattr(self, 'current_page'):
+                    self.render_pdf_page(self.current_page, publish=False)
     
-    def scale_annotations(self, old_width, old_height, old_x_offset, old_y_offset):
-        """Scale all annotations proportionally when canvas size changes."""
+    def reproject_annotations(self, old_width, old_height, old_x_offset, old_y_offset):
+        """Move all annotations from the old page layout onto the current one.
+        
+        Canvas coordinates are a linear function of the normalized points, so the
+        geometry is mapped with one tag-level scale and move rather than one Tk call
+        per item. Line widths are only reconfigured for items whose width in whole
+        pixels (what Tk draws) changes. Without a usable old layout every item is
+        projected exactly from the model.
+        """
         if old_width <= 0 or old_height <= 0:
-            return
-        
-        # Prevent concurrent scaling operations
-        if hasattr(self, '_scaling_in_progress') and self._scaling_in_progress:
-            return
-        
-        self._scaling_in_progress = True
-        
-        try:
-            # Calculate scale factors
-            scale_x = self.image_width / old_width
-            scale_y = self.image_height / old_height
-            
-            # Get all canvas items except the PDF background
-            all_items = self.canvas.find_all()
-            for item in all_items:
-                tags = self.canvas.gettags(item)
-                # Skip the PDF background
-                if "pdf_background" in tags:
-                    continue
-                
-                # Get item type
-                item_type = self.canvas.type(item)
-                
-                if item_type == "line":
-                    # Scale line coordinates
-                    coords = self.canvas.coords(item)
-                    new_coords = []
-                    for i in range(0, len(coords), 2):
-                        # Get original position relative to old PDF
-                        rel_x = (coords[i] - old_x_offset) * scale_x
-                        rel_y = (coords[i+1] - old_y_offset) * scale_y
-                        # Apply new offset
-                        new_x = rel_x + self.x_offset
-                        new_y = rel_y + self.y_offset
-                        new_coords.extend([new_x, new_y])
-                    self.canvas.coords(item, *new_coords)
-                    
-                    # Also scale line width
-                    old_width_val = self.canvas.itemcget(item, "width")
-                    if old_width_val:
-                        try:
-                            new_width_val = float(old_width_val) * min(scale_x, scale_y)
-                            self.canvas.itemconfig(item, width=new_width_val)
-                        except:
-                            pass
-                
-                elif item_type == "oval":
-                    # Scale oval (endpoint dots) coordinates
-                    coords = self.canvas.coords(item)
-                    if len(coords) == 4:
-                        x1, y1, x2, y2 = coords
-                        # Get center
-                        center_x = (x1 + x2) / 2
-                        center_y = (y1 + y2) / 2
-                        # Scale center position
-                        rel_x = (center_x - old_x_offset) * scale_x
-                        rel_y = (center_y - old_y_offset) * scale_y
-                        new_center_x = rel_x + self.x_offset
-                        new_center_y = rel_y + self.y_offset
-                        # Scale radius
-                        radius = (x2 - x1) / 2
-                        new_radius = radius * min(scale_x, scale_y)
-                        # Update coordinates
-                        self.canvas.coords(item, 
-                            new_center_x - new_radius, new_center_y - new_radius,
-                            new_center_x + new_radius, new_center_y + new_radius)
-        finally:
-            self._scaling_in_progress = False
-
-
+            for item in self.annotations.items():
+                coords = self.annotations.project(item, self.image_width, self.image_height,
+                                                  self.x_offset, self.y_offset)
+                self.canvas.coords(item, *coords)
+                self.canvas.itemconfig(item, width=self.annotations.line_width(item, self.image_width))
+        else:
+            self.canvas.scale("annotation", old_x_offset, old_y_offset,
+                              self.image_width / old_width, self.image_height / old_height)
+            self.canvas.move("annotation", self.x_offset - old_x_offset, self.y_offset - old_y_offset)
+            for item in self.annotations.items():
+                width = self.annotations.line_width(item, self.image_width)
+                if round(width) != round(self.annotations.line_width(item, old_width)):
+                    self.canvas.itemconfig(item, width=width)
+        
+        # Keep in-progress strokes in sync with their re-projected items
+        for stroke in [self.local_stroke] + list(self.remote_strokes.values()):
+            if stroke is not None:
+                stroke["coords"] = self.annotations.project(
+                    stroke["item"], self.image_width, self.image_height, self.x_offset, self.y_offset)
+    
+    def go_to_page(self, page_num):
+        """Display any page of the PDF (e.g. one picked in the thumbnail navigator)."""
+        if self.document_id and 0 <= page_num < self.total_pages and page_num != self.current_page:
+            self.current_page = page_num
+            self.page_var.set(self.current_page + 1)  # Display is 1-based
+            self.render_pdf_page(self.current_page)
     
     def next_page(self):
         """Display the next page of the PDF."""
-        if self.pdf_document and self.current_page < self.total_pages - 1:
+        if self.document_id and self.current_page < self.total_pages - 1:
             self.current_page += 1
             self.page_var.set(self.current_page + 1)  # Display is 1-based
             self.render_pdf_page(self.current_page)
     
     def previous_page(self):
         """Display the previous page of the PDF."""
-        if self.pdf_document and self.current_page > 0:
+        if self.document_id and self.current_page > 0:
             self.current_page -= 1
             self.page_var.set(self.current_page + 1)  # Display is 1-based
             self.render_pdf_page(self.current_page)
@@ -654,83 +1045,122 @@ class CollaborativeWhiteboard:
     def clear_annotations(self):
         """Clear only annotations while keeping the image."""
         self.canvas.delete("annotation")
-        self.prev_x = None
-        self.prev_y = None
+        self.annotations.clear()
+        self.local_stroke = None
+        self.remote_strokes.clear()
+        stroke_store.clear()
         # Notify clients to clear their views
-        socketio.emit("clear_annotations")
+        broadcaster.publish("clear_annotations", room=VIEWERS_ROOM)
     
     def clear_all(self):
         """Clear everything from the canvas"""
         self.canvas.delete("all")
         self.current_image_tk = None
-        self.prev_x = None
-        self.prev_y = None
-        # Close PDF if open
-        if self.pdf_document:
-            self.pdf_document.close()
-            self.pdf_document = None
+        self.annotations.clear()
+        self.local_stroke = None
+        self.remote_strokes.clear()
+        stroke_store.clear()
+        stroke_store.current_page = 0
+        broadcaster.set_page(0)
+        # Stop background rendering, then close PDF if open
+        self.prerender.cancel()
+        self.prerender_path = None
+        self.prerender_var.set("")
+        self.thumbnail_strip.clear()
+        self.text_indexer.cancel()
+        self.text_index = None
+        self.clear_search_results()
+        self.search_status_var.set("")
+        self.render_service.close_document()
+        self.publish_pending_page = None
+        pdf_distributor.close()
+        if self.document_id:
+            self.document_id = None
             self.total_pages = 0
             self.current_page = 0
             self.page_var.set(1)
             self.total_pages_var.set("/ 0")
-        socketio.emit("clear_all")
-    
-    def draw_point(self, x, y, is_start, line_width, pen_color):
-        """Draw a point or line segment from received data."""
-        # Convert normalized coordinates (0-1) to canvas coordinates
-        canvas_x = x * self.image_width + self.x_offset
-        canvas_y = y * self.image_height + self.y_offset
-        
-        # Handle starting points
-        if is_start:
-            self.prev_x = None
-            self.prev_y = None
-
-        # Draw line if we have a previous point
-        if self.prev_x is not None and self.prev_y is not None:
-            self.canvas.create_line(
-                self.prev_x, self.prev_y, canvas_x, canvas_y, 
-                fill=pen_color, width=line_width, tags="annotation"
-            )
-        
-        # Draw the current point
-        self.canvas.create_oval(
-            canvas_x - line_width / 2, canvas_y - line_width / 2,
-            canvas_x + line_width / 2, canvas_y + line_width / 2,
-            fill=pen_color, outline=pen_color, tags="annotation"
-        )
-        
-        # Update previous point
-        self.prev_x = canvas_x
-        self.prev_y = canvas_y
+        broadcaster.publish("clear_all", room=VIEWERS_ROOM)
+    
+    def draw_point(self, sender, stroke_id, x, y, is_start, is_end, line_width, pen_color):
+        """Draw a point or line segment from received (normalized) data."""
+        # Continuity is tracked per sender, so concurrent strokes never join up
+        stroke = self.remote_strokes.get(sender)
+        if is_start or stroke is None or stroke["stroke_id"] != stroke_id:
+            stroke = self.begin_polyline(x, y, line_width, pen_color)
+            stroke["stroke_id"] = stroke_id
+            self.remote_strokes[sender] = stroke
+        else:
+            self.extend_polyline(stroke, x, y)
+        
+        if is_end:
+            del self.remote_strokes[sender]
 
+    def wake_coordinate_drain(self):
+        """Called from Socket.IO threads when coordinates are queued."""
+        with self.drain_lock:
+            if self.drain_scheduled:
+                return
+            self.drain_scheduled = True
+        try:
+            self.root.after(0, self.process_coordinates)
+        except RuntimeError:
+            # Tk not reachable from this thread; the fallback poll will pick it up
+            with self.drain_lock:
+                self.drain_scheduled = False
+    
+    def poll_coordinates(self):
+        """Fallback in case a wakeup was missed."""
+        if not coordinates_queue.empty():
+            self.wake_coordinate_drain()
+        self.root.after(DRAIN_FALLBACK_MS, self.poll_coordinates)
+    
     def process_coordinates(self):
-        """Process coordinates from the queue."""
+        """Drain the coordinate queue for up to one frame budget."""
+        with self.drain_lock:
+            self.drain_scheduled = False
+        
+        deadline = time.perf_counter() + DRAIN_BUDGET
         processed_count = 0
-        # Batch processing - limit to 20 coordinates per cycle for smooth UI
-        while not coordinates_queue.empty() and processed_count < 20:
-            data = coordinates_queue.get()
+        per_sender = {}
+        lag_ms = 0.0
+        while time.perf_counter() < deadline:
+            try:
+                received_at, sender, data = coordinates_queue.get_nowait()
+            except queue.Empty:
+                break
             processed_count += 1
+            per_sender[sender] = per_sender.get(sender, 0) + 1
+            lag_ms = (time.monotonic() - received_at) * 1000
             # Coordinates are already normalized (0-1)
             x = data["x"] 
             y = data["y"]
             is_start = data.get("is_start", False)
+            is_end = data.get("is_end", False)
             line_width = data.get("line_width", self.line_width)
             pen_color = data.get("pen_color", self.pen_color)
-            self.draw_point(x, y, is_start, line_width, pen_color)
+            self.draw_point(sender, data.get("stroke_id"), x, y, is_start, is_end, line_width, pen_color)
         
-        # Only update UI once per batch for better performance
+        # No explicit redraw: Tk repaints once when idle, coalescing all items drawn above
         if processed_count > 0:
-            self.canvas.update_idletasks()
-        
-        self.root.after(100, self.process_coordinates)
+            self.last_drain_lag_ms = lag_ms
+            update_coordinate_metrics(lag_ms, processed_count)
+            for sender, count in per_sender.items():
+                coordinates_consumed(sender, count)
+        
+        # Out of budget with work left: yield so Tk can repaint, then continue
+        if not coordinates_queue.empty():
+            with self.drain_lock:
+                self.drain_scheduled = True
+            self.root.after(DRAIN_YIELD_MS, self.process_coordinates)
     
     def cleanup(self):
         """Clean up all resources when closing"""
+        self.prerender.shutdown()
+        self.text_indexer.shutdown()
         if self.voice_chat:
             self.voice_chat.cleanup()
-        if self.pdf_document:
-            self.pdf_document.close()
+        self.render_service.shutdown()
 
 def run_tkinter(host_ip):
     """Start the Tkinter GUI."""